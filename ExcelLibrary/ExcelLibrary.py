@@ -15,25 +15,528 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import gc
 import os
-import natsort
-from operator import itemgetter
-from datetime import datetime, timedelta
-from xlrd import open_workbook, cellname, xldate_as_tuple, \
-    XL_CELL_NUMBER, XL_CELL_DATE, XL_CELL_TEXT, XL_CELL_BOOLEAN, \
-    XL_CELL_ERROR, XL_CELL_BLANK, XL_CELL_EMPTY, error_text_from_code
-from xlwt import easyxf, Workbook
-from xlutils.copy import copy as copy
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from celltypes import XL_CELL_NUMBER, XL_CELL_DATE, XL_CELL_TEXT, XL_CELL_BOOLEAN, \
+    XL_CELL_ERROR, XL_CELL_BLANK, XL_CELL_EMPTY
+from columnstats import column_differences, column_statistics, numeric_column
+from backends import DATE_FORMAT, engine_for, iter_sheet_rows, typed_values, write_workbook
+from editjournal import EditJournal, EditedSheet
+from export import export_csv, export_json_lines
+from lazyimport import LazyModule
+from perfstats import stats
+from records import Header, Record, RecordList
+from sheetdiff import sheet_differences
+from snapshot import SnapshotBook, SnapshotCache
 from version import VERSION
 
+natsort = LazyModule('natsort')
+xlrd = LazyModule('xlrd')
+
 _version_ = VERSION
 
+_CELL_TYPE_NAMES = {XL_CELL_NUMBER: 'number', XL_CELL_TEXT: 'string', XL_CELL_DATE: 'date', XL_CELL_BOOLEAN: 'boolean',
+                    XL_CELL_ERROR: 'error', XL_CELL_BLANK: 'blank', XL_CELL_EMPTY: 'empty'}
+
+_CELL_NAME_RE = re.compile(r'^\$?([A-Z]{1,3})\$?([1-9][0-9]*)$')
+
+
+def _parse_cell_name(cell_name):
+    """
+    Converts an A1 style cell name such as 'B2', '$AA$10' or 'AAB12' into a zero based (row, column) tuple.
+    """
+    match = _CELL_NAME_RE.match(str(cell_name).strip().upper())
+    if not match:
+        raise ValueError("'%s' is not a valid cell name, expected an A1 style reference such as 'B2' or '$B$2'" % cell_name)
+    letters, digits = match.groups()
+    column = 0
+    for letter in letters:
+        column = column * 26 + ord(letter) - ord('A') + 1
+    return int(digits) - 1, column - 1
+
+
+def _parse_cell_range(cell_range):
+    """
+    Converts an A1 style range such as 'A1:F500', or a single cell name, into zero based (first row, first column, last row, last column).
+    """
+    names = str(cell_range).split(':')
+    if len(names) > 2:
+        raise ValueError("'%s' is not a valid cell range, expected an A1 style range such as 'A1:F500'" % cell_range)
+    first = _parse_cell_name(names[0])
+    last = _parse_cell_name(names[-1])
+    return min(first[0], last[0]), min(first[1], last[1]), max(first[0], last[0]), max(first[1], last[1])
+
+
+def _as_list(value):
+    if value is None or isinstance(value, (list, tuple)):
+        return value
+    return [item.strip() for item in value.split(',')]
+
+
+def _range_number(value):
+    return value if value in (None, '') else float(value)
+
+
+def _range_date(value):
+    # Dates that are already parsed are written as they are, and like numbers an empty value stays an empty cell.
+    if value in (None, '') or isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%d-%m-%Y')
+
+
+def _output_format(outputFormat):
+    outputFormat = str(outputFormat).lower()
+    if outputFormat not in ('pairs', 'grid', 'dict'):
+        raise ValueError("'%s' is not a valid output format, expected pairs, grid or dict" % outputFormat)
+    return outputFormat
+
+
+def _index_key(value):
+    """
+    Normalizes a cell value or a value given in a test so that numbers match whether they are given as numbers or as text.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class _SheetSnapshot(object):
+    """
+    The (cell name, value) pairs of a sheet, stored once in the order the getters return them.
+
+    Cell names are naturally sorted, which orders them by column name first and then by row number,
+    so every column occupies a contiguous block of `nrows` pairs and rows can be sliced out by stride.
+    """
+
+    def __init__(self, sheet):
+        self.name = sheet.name
+        self.nrows = sheet.nrows
+        self.ncols = sheet.ncols
+        cellname = xlrd.cellname
+        with stats.timer('natsort'):
+            self.columnOrder = natsort.natsorted(range(sheet.ncols), key=xlrd.colname)
+        self.columnBlock = [0] * sheet.ncols
+        self.pairs = []
+        for block, col_index in enumerate(self.columnOrder):
+            self.columnBlock[col_index] = block
+            values = sheet.col_values(col_index)
+            self.pairs.extend((cellname(row_index, col_index), values[row_index]) for row_index in range(sheet.nrows))
+
+    def sheet_values(self):
+        return list(self.pairs)
+
+    def row_values(self, row):
+        # Negative rows count from the end like xlrd, they would otherwise index into the previous column block.
+        if not -self.nrows <= row < self.nrows:
+            raise IndexError('row %d is outside of sheet %s' % (row, self.name))
+        row %= self.nrows
+        return [self.pairs[block * self.nrows + row] for block in range(self.ncols)]
+
+    def column_values(self, column):
+        if not -self.ncols <= column < self.ncols:
+            raise IndexError('column %d is outside of sheet %s' % (column, self.name))
+        start = self.columnBlock[column] * self.nrows
+        return self.pairs[start:start + self.nrows]
+
+
+class _WorkbookCache(object):
+    """
+    A process wide, least recently used cache of parsed xlrd workbooks.
+
+    Entries are keyed by absolute path, modification time, size and whether formatting was parsed, so a file rewritten
+    on disk is parsed again and its stale entries are dropped. Cached books are parsed without mmap so a rewrite cannot change the bytes
+    that on demand sheet loading reads from.
+    """
+
+    def __init__(self, maxWorkbooks=4, maxBytes=None):
+        self.maxWorkbooks = maxWorkbooks
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self._books = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, filename, formattingInfo=True):
+        path = _unicode_path(filename)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime, stat.st_size, formattingInfo)
+        with self._lock:
+            entry = self._books.pop(key, None)
+            if entry is not None:
+                self._books[key] = entry
+                self.hits += 1
+                stats.count('cache_hits')
+                return entry[0]
+            self.misses += 1
+            stats.count('cache_misses')
+            # A byte string path is only kept when it does not decode, and then it cannot name the file of a unicode key.
+            for stale in [k for k in self._books if type(k[0]) is type(path) and k[0] == path and k[1:3] != key[1:3]]:
+                del self._books[stale]
+        engine = engine_for(path)
+        stats.count('bytes_loaded', stat.st_size)
+        if not self._fits(stat.st_size):
+            return _snapshotCache.open(path, stat, engine, formatting_info=formattingInfo)
+        book = _snapshotCache.open(path, stat, engine, use_mmap=False, formatting_info=formattingInfo)
+        with self._lock:
+            self._books[key] = (book, stat.st_size)
+            self._evict()
+        return book
+
+    def configure(self, maxWorkbooks, maxBytes):
+        with self._lock:
+            self.maxWorkbooks = maxWorkbooks
+            self.maxBytes = maxBytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._books.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return {'workbooks': [key[0] for key in self._books],
+                    'bytes': self._total_bytes(),
+                    'maxWorkbooks': self.maxWorkbooks,
+                    'maxBytes': self.maxBytes,
+                    'hits': self.hits,
+                    'misses': self.misses}
+
+    def _fits(self, size):
+        return self.maxWorkbooks > 0 and (self.maxBytes is None or size <= self.maxBytes)
+
+    def _total_bytes(self):
+        return sum(size for (book, size) in self._books.values())
+
+    def _evict(self):
+        while self._books and (len(self._books) > self.maxWorkbooks or
+                               (self.maxBytes is not None and self._total_bytes() > self.maxBytes)):
+            self._books.popitem(last=False)
+
+
+_workbookCache = _WorkbookCache()
+_snapshotCache = SnapshotCache(os.environ.get('EXCEL_SNAPSHOT_CACHE_DIR'))
+
+
+def _unicode_path(path):
+    """
+    Returns the absolute path as unicode, decoding a byte string path with the file system encoding, so the same file
+    named by a byte string or by a unicode path gets the same cache entry. A path that does not decode is returned as it is.
+    """
+    path = os.path.abspath(path)
+    if isinstance(path, str):
+        try:
+            return path.decode(sys.getfilesystemencoding() or 'ascii')
+        except UnicodeDecodeError:
+            pass
+    return path
+
+
+def _file_state(path):
+    """
+    Returns the absolute path, modification time and size of a file, or None when there is no such file.
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return path, stat.st_mtime, stat.st_size
+
+
+def _read_workbook_task(task):
+    """
+    Reads the values of the given sheets, or of every sheet, of one file. Runs in a worker process of
+    `Read Excel Files In Parallel`, so errors are returned instead of raised to keep the other files going.
+    """
+    path, sheetnames, includeEmptyCells = task
+    sheets = []
+    try:
+        book = engine_for(path).open_book(path, use_mmap=False)
+        for sheetname in sheetnames or book.sheet_names():
+            values = _SheetSnapshot(book.sheet_by_name(sheetname)).sheet_values()
+            if not includeEmptyCells:
+                values = [(k, v) for (k, v) in values if v]
+            sheets.append((sheetname, values))
+    except Exception as error:
+        return path, sheets, '%s: %s' % (type(error).__name__, error)
+    return path, sheets, None
+
+
+class _BackgroundSave(object):
+    """
+    A workbook built on the calling thread that a worker thread is writing to its file. An error of the worker is kept
+    and raised again by `wait`.
+    """
+
+    def __init__(self, workbook, filename, on_saved):
+        self.workbook = workbook
+        self.filename = filename
+        self.error = None
+        self._on_saved = on_saved
+        self._thread = threading.Thread(target=self._run, name='Save %s' % filename)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            write_workbook(self.workbook, self.filename)
+            if stats.enabled:
+                stats.count('bytes_saved', os.path.getsize(self.filename))
+            self._on_saved()
+        except Exception:
+            self.error = sys.exc_info()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+
+_GC_INTERVAL = 5.0
+_lastCollection = 0.0
+
 
-class ExcelLibrary:
+def _collect_unloaded_sheets():
+    """
+    Runs the cycle collector at most once every few seconds. Unloaded xlrd sheets reference themselves through bound
+    methods, so only the cycle collector frees them, but a loop switching between more sheets than the limit unloads a
+    sheet on every read and a full collection each time would cost more than the sheets it frees.
+    """
+    global _lastCollection
+    now = time.time()
+    if now - _lastCollection >= _GC_INTERVAL:
+        _lastCollection = now
+        gc.collect()
+
+
+class _ExcelSession(object):
+    """
+    The state of one open workbook: the parsed book, its sheet names, the pending writes and the cached sheet values.
+
+    A read only session was parsed without formatting, its file is parsed again with formatting when it is saved, which
+    fails when the file has changed on disk since it was opened.
+    The session remembers the last file it was opened from or saved to and the version of the journal that file holds,
+    so saving again to that file without changes in between writes nothing.
+    When a maximum number of loaded sheets is set, the least recently used sheets of the book are unloaded beyond it.
+    """
+
+    def __init__(self, wb=None, sheetNames=None, fileName=None, sourcePath=None, readOnly=False, sourceFile=None):
+        self.wb = wb
+        self.tb = None
+        self.sheetNum = None
+        self.sheetNames = sheetNames
+        self.fileName = fileName
+        self.sourcePath = sourcePath
+        self.readOnly = readOnly
+        self.pendingSaves = []
+        self.savedVersion = 0
+        self.sourceFile = sourceFile or (_file_state(sourcePath) if sourcePath else None)
+        self.savedFile = self.sourceFile
+        self._savedLock = threading.Lock()
+        self.maxLoadedSheets = None
+        self.keepFormatting = False
+        self.loadedSheets = OrderedDict()
+        self.sheetCache = {}
+        self.columnIndexes = {}
+        self.headers = {}
+        self.journal = EditJournal()
+
+    def get_sheet(self, sheetname):
+        my_sheet_index = self.sheetNames.index(sheetname)
+        base = None
+        if self.wb is not None and my_sheet_index < self.wb.nsheets:
+            if stats.enabled and not self.wb.sheet_loaded(my_sheet_index):
+                with stats.timer('load_sheet'):
+                    base = self.wb.sheet_by_index(my_sheet_index)
+            else:
+                base = self.wb.sheet_by_index(my_sheet_index)
+            self._keep_loaded(my_sheet_index)
+        edits = self.journal.sheet_edits(sheetname)
+        if edits is None and base is not None:
+            return base
+        return EditedSheet(sheetname, base, edits, self.datemode())
+
+    def _keep_loaded(self, sheetIndex):
+        # Reads are recorded without a limit too, so the sheets read before a limit is set are unloaded as well.
+        loaded = self.loadedSheets
+        loaded.pop(sheetIndex, None)
+        loaded[sheetIndex] = True
+        if self.maxLoadedSheets is not None and len(loaded) > self.maxLoadedSheets:
+            while len(loaded) > self.maxLoadedSheets:
+                unloaded = loaded.popitem(last=False)[0]
+                self.wb.unload_sheet(unloaded)
+                self.invalidate_sheet_cache(self.sheetNames[unloaded])
+            _collect_unloaded_sheets()
+
+    def datemode(self):
+        return self.wb.datemode if self.wb is not None else 0
+
+    def write_cell(self, sheetname, column, row, value, num_format_str=''):
+        self.sheetNames.index(sheetname)
+        self.journal.write(sheetname, int(row), int(column), value, num_format_str)
+        self.invalidate_sheet_cache(sheetname)
+        stats.count('cells_written')
+
+    def save(self, filename):
+        """
+        Saves the workbook to the file and returns True, or returns False without writing when the file already holds it.
+        """
+        self.wait_for_saves(filename)
+        if self.is_saved_to(filename):
+            return False
+        version = self.journal.version
+        self._open_for_saving()
+        self.tb = engine_for(filename).save(filename, self.wb, self.journal, self.sheetNames,
+                                            self.get_sheet, self.datemode(), self.keepFormatting)
+        if stats.enabled:
+            stats.count('bytes_saved', os.path.getsize(filename))
+        self._saved(filename, version)
+        return True
+
+    def save_in_background(self, filename):
+        """
+        Builds the workbook to save from the book and the pending writes, then writes it to the file on a worker thread.
+        Later writes to the session do not change the file being written.
+        """
+        filename = os.path.abspath(filename)
+        self.wait_for_saves(filename)
+        if self.is_saved_to(filename):
+            return False
+        version = self.journal.version
+        self._open_for_saving()
+        self.tb = engine_for(filename).build(self.wb, self.journal, self.sheetNames, self.get_sheet, self.datemode(),
+                                             self.keepFormatting)
+        self.pendingSaves.append(_BackgroundSave(self.tb, filename, lambda: self._saved(filename, version)))
+        return True
+
+    def is_saved_to(self, filename):
+        """
+        Returns whether the file holds the workbook as it is now, because it was opened from or saved to that file since
+        the last change and the file has not changed on disk since.
+        """
+        with self._savedLock:
+            savedVersion, savedFile = self.savedVersion, self.savedFile
+        return savedFile is not None and savedVersion == self.journal.version and savedFile == _file_state(filename)
+
+    def modified_sheets(self):
+        with self._savedLock:
+            savedVersion = self.savedVersion
+        modified = self.journal.modified_sheets(savedVersion)
+        return [sheetname for sheetname in self.sheetNames if sheetname in modified]
+
+    def _saved(self, filename, version):
+        # Runs on the thread of a background save, so the saved version and file are only changed together under the
+        # lock. A background save that finishes after a later save must not mark the older version as saved.
+        state = _file_state(filename)
+        with self._savedLock:
+            if version >= self.savedVersion:
+                self.savedVersion = version
+                self.savedFile = state
+
+    def wait_for_saves(self, filename=None, timeout=None):
+        """
+        Waits for the background saves of the session, or only those to the given file, and raises the first error of
+        the finished ones. Saves that are still running after the timeout are waited for again the next time.
+        """
+        if filename is not None:
+            filename = os.path.abspath(filename)
+        deadline = None if timeout is None else time.time() + timeout
+        running = []
+        error = None
+        for pending in self.pendingSaves:
+            if filename is not None and pending.filename != filename:
+                running.append(pending)
+            elif not pending.wait(None if deadline is None else max(0, deadline - time.time())):
+                running.append(pending)
+            elif pending.error is not None and error is None:
+                error = pending.error
+        self.pendingSaves = running
+        if error is not None:
+            raise error[0], error[1], error[2]
+        if filename is None and running:
+            raise RuntimeError('Saving %s did not finish within %s seconds' % (', '.join([pending.filename for pending in running]), timeout))
+
+    def _open_for_saving(self):
+        if isinstance(self.wb, SnapshotBook):
+            self.wb = self.wb.open_source(engine_for(self.wb.path))
+            self.loadedSheets.clear()
+        elif self.readOnly:
+            # The pending writes belong to the workbook that was opened, so they must not be applied to a rewritten file.
+            if _file_state(self.sourcePath) != self.sourceFile:
+                raise ValueError("'%s' has changed on disk since it was opened" % self.sourcePath)
+            self.wb = engine_for(self.sourcePath).open_book(self.sourcePath, use_mmap=False)
+            self.loadedSheets.clear()
+        self.readOnly = False
+
+    def get_sheet_snapshot(self, sheetname):
+        snapshot = self.sheetCache.get(sheetname)
+        if snapshot is None:
+            with stats.timer('sheet_snapshot'):
+                snapshot = _SheetSnapshot(self.get_sheet(sheetname))
+            stats.count('cells_read', snapshot.nrows * snapshot.ncols)
+            self.sheetCache[sheetname] = snapshot
+        return snapshot
+
+    def get_column_index(self, sheetname, columns):
+        """
+        Returns a dictionary from the normalized values of the columns to the rows holding them, building it on first use.
+        """
+        indexes = self.columnIndexes.setdefault(sheetname, {})
+        index = indexes.get(columns)
+        if index is None:
+            sheet = self.get_sheet(sheetname)
+            with stats.timer('column_index'):
+                keys = zip(*[[_index_key(value) for value in sheet.col_values(column)] for column in columns])
+                index = {}
+                for row, key in enumerate(keys):
+                    index.setdefault(key, []).append(row)
+            indexes[columns] = index
+        return index
+
+    def get_header(self, sheetname, headerRow):
+        """
+        Returns the header read from the given row of the sheet. Each header row is read once until the sheet is modified.
+        """
+        headers = self.headers.setdefault(sheetname, {})
+        header = headers.get(headerRow)
+        if header is None:
+            header = headers[headerRow] = Header(self.get_sheet(sheetname).row_values(headerRow))
+        return header
+
+    def invalidate_sheet_cache(self, sheetname):
+        self.sheetCache.pop(sheetname, None)
+        self.columnIndexes.pop(sheetname, None)
+        self.headers.pop(sheetname, None)
+
+
+class ExcelLibrary(object):
     """
     This test library provides keywords to allow opening, reading, writing
      and saving Excel files from Robot Framework.
 
+    Files with the .xls extension are read with xlrd and written with xlwt. Files with the .xlsx or .xlsm extension are
+    read with the streaming read only mode of openpyxl, which needs to be installed separately, and the same keywords
+    can be used for both kinds of file. A workbook is saved in the format given by the extension of the file name it is saved to.
+
+    *Working with several workbooks*
+
+    Any number of workbooks can be open at the same time. Opening or creating a workbook with an alias registers it under
+    that alias, `Switch Excel` makes it the current workbook and the other keywords accept the alias as an optional argument
+    to work on a workbook without switching to it. Keywords used without an alias work on the current workbook, which is
+    the one opened, created or switched to last.
+
+    | Open Excel             | expected.xls   | alias=expected  |                  |
+    | Open Excel             | actual.xls     | alias=actual    |                  |
+    | ${expected}=           | Get Sheet Values  | Results      | alias=expected   |
+    | ${actual}=             | Get Sheet Values  | Results      |                  |
+
 
     *Before running tests*
 
@@ -48,42 +551,55 @@ class ExcelLibrary:
     ROBOT_LIBRARY_VERSION = VERSION
 
     def __init__(self):
-        self.wb = None
-        self.tb = None
-        self.sheetNum = None
-        self.sheetNames = None
-        self.fileName = None
+        self._sessions = {}
+        self._session = _ExcelSession()
+        self._maxLoadedSheets = None
+        self._keepFormatting = False
         if os.name is "nt":
             self.tmpDir = "Tmp"
         else:
             self.tmpDir = "tmp"
 
-    def open_excel(self, filename, useTempDir=False):
+    wb = property(lambda self: self._session.wb)
+    tb = property(lambda self: self._session.tb)
+    sheetNum = property(lambda self: self._session.sheetNum)
+    sheetNames = property(lambda self: self._session.sheetNames)
+    fileName = property(lambda self: self._session.fileName)
+
+    def open_excel(self, filename, useTempDir=False, alias=None, readOnly=False):
         """
         Opens the Excel file from the path provided in the file name parameter.
         If the boolean useTempDir is set to true, depending on the operating system of the computer running the test the file will be opened in the Temp directory if the operating system is Windows or tmp directory if it is not.
+        Parsed workbooks are kept in a process wide cache, so opening an unchanged file again does not parse it again. See `Set Excel Workbook Cache Limits`.
+
+        With readOnly set to true the cell formatting of an xls file is not parsed, which makes opening faster and uses less memory.
+        The cells can still be written to, the file is then parsed again with its formatting when the workbook is saved, so it should not be replaced on disk in between.
 
         Arguments:
                 |  File Name (string)                      | The file name string value that will be used to open the excel file to perform tests upon.                                  |
                 |  Use Temporary Directory (default=False) | The file will not open in a temporary directory by default. To activate and open the file in a temporary directory, pass 'True' in the variable. |
+                |  Alias (default=None)  | The alias the workbook can be selected with by `Switch Excel` and by the alias argument of other keywords. |
+                |  Read Only (default=False)  | Skips parsing the cell formatting. To activate, pass 'True' in the variable. |
         Example:
 
-        | *Keywords*           |  *Parameters*                                      |
-        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |
+        | *Keywords*           |  *Parameters*                                      |                  |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |                  |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |  readOnly=True   |
 
         """
         if useTempDir is True:
             print 'Opening file at %s' % filename
-            self.wb = open_workbook(os.path.join("/", self.tmpDir, filename), formatting_info=True, on_demand=True)
+            self._open_session(os.path.join("/", self.tmpDir, filename), alias, readOnly)
         else:
-            self.wb = open_workbook(filename, formatting_info=True, on_demand=True)
-            self.fileName = filename
-            self.sheetNames = self.wb.sheet_names()
+            self._open_session(filename, alias, readOnly, filename)
 
-    def close_excel_file(self):
+    def close_excel_file(self, alias=None):
         """
         Closes the Excel file in the current session
+        Saves started with `Save Excel In Background` are waited for first, and an error of one of them fails this keyword after the workbook is closed.
 
+        Arguments:
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*            |  *Parameters*                                      |
@@ -91,18 +607,69 @@ class ExcelLibrary:
         | Close Excel           |                                                    |
 
         """
-        self.wb = None
-        self.tb = None
-        self.sheetNum = None
-        self.sheetNames = None
-        self.fileName = None
+        session = self._get_session(alias)
+        for name, registered in self._sessions.items():
+            if registered is session:
+                del self._sessions[name]
+        if session is self._session:
+            self._session = _ExcelSession()
+        session.wait_for_saves()
+
+    def switch_excel(self, alias):
+        """
+        Makes the workbook opened or created with the given alias the current workbook and returns the alias of the previous current workbook.
+        Every open workbook keeps its own pending changes and cached values, so switching between workbooks does not read or copy anything.
+
+        Arguments:
+                |  Alias (string)  | The alias given to the workbook when it was opened or created.  |
+        Example:
 
-    def open_excel_current_directory(self, filename):
+        | *Keywords*           |  *Parameters*                                          |                    |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls      |  alias=expected    |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\NewExcelRobotTest.xls   |  alias=actual      |
+        | Switch Excel         |  expected                                              |                    |
+
+        """
+        previous = self._session
+        self._session = self._get_session(alias)
+        for name, session in self._sessions.items():
+            if session is previous:
+                return name
+        return None
+
+    def close_all_excel_files(self):
+        """
+        Closes every workbook opened or created in this session, including the ones that were given an alias.
+        Saves started with `Save Excel In Background` are waited for first, and the first error of them fails this keyword after the workbooks are closed.
+
+        Example:
+
+        | *Keywords*              |  *Parameters*  |
+        | Close All Excel Files   |                |
+
+        """
+        sessions = set(self._sessions.values())
+        sessions.add(self._session)
+        self._sessions = {}
+        self._session = _ExcelSession()
+        error = None
+        for session in sessions:
+            try:
+                session.wait_for_saves()
+            except Exception:
+                error = error or sys.exc_info()
+        if error is not None:
+            raise error[0], error[1], error[2]
+
+    def open_excel_current_directory(self, filename, alias=None, readOnly=False):
         """
         Opens the Excel file from the current directory using the directory the test has been run from.
+        Like `Open Excel` the parsed workbook is reused from the workbook cache when the file has not changed, and it can be opened without formatting with readOnly.
 
         Arguments:
                 |  File Name (string)  | The file name string value that will be used to open the excel file to perform tests upon.  |
+                |  Alias (default=None)  | The alias the workbook can be selected with by `Switch Excel` and by the alias argument of other keywords. |
+                |  Read Only (default=False)  | Skips parsing the cell formatting. To activate, pass 'True' in the variable. |
         Example:
 
         | *Keywords*           |  *Parameters*        |
@@ -111,13 +678,199 @@ class ExcelLibrary:
         """
         workdir = os.getcwd()
         print 'Opening file at %s' % filename
-        self.wb = open_workbook(os.path.join(workdir, filename), formatting_info=True, on_demand=True)
-        self.sheetNames = self.wb.sheet_names()
+        self._open_session(os.path.join(workdir, filename), alias, readOnly)
+
+    def set_excel_sheet_load_limit(self, maxLoadedSheets=None):
+        """
+        Sets how many sheets of each open workbook are kept loaded in memory. When a keyword reads a sheet beyond the limit,
+        the least recently read sheet is unloaded together with the values cached for it, and it is loaded again the next time it is read.
+        By default every sheet that was read stays loaded. The limit applies to the open workbooks and to the workbooks opened later.
+
+        Arguments:
+                |  Max Loaded Sheets (default=None)  | The number of sheets kept loaded per workbook, at least 1. By default the number is not limited. |
+        Example:
+
+        | *Keywords*                    |  *Parameters*  |
+        | Set Excel Sheet Load Limit    |  2             |
+
+        """
+        maxLoadedSheets = None if maxLoadedSheets in (None, '', 'None') else int(maxLoadedSheets)
+        if maxLoadedSheets is not None and maxLoadedSheets < 1:
+            raise ValueError('At least one sheet has to stay loaded, got %d' % maxLoadedSheets)
+        self._maxLoadedSheets = maxLoadedSheets
+        for session in set(self._sessions.values()) | set([self._session]):
+            session.maxLoadedSheets = maxLoadedSheets
+
+    def set_excel_keep_cell_formatting(self, keepFormatting=True):
+        """
+        Sets whether the cells written by the writing keywords keep the font, borders, fill, alignment and number format they had in the opened workbook.
+        By default a written cell gets a plain style. When the formatting is kept, a date write only replaces the number format of the cell.
+        Empty cells inside the rows and columns the sheet used in the opened workbook keep the style of their row, column or sheet,
+        only cells written outside of them get a plain style. The setting applies to the open workbooks and to the workbooks opened later,
+        and is used when a workbook is saved. Cells written to an opened .xlsx workbook always keep their formatting.
+
+        Arguments:
+                |  Keep Formatting (default=True)  | Keeps the formatting of written cells. To go back to plain styles, pass 'False' in the variable. |
+        Example:
+
+        | *Keywords*                       |  *Parameters*                                      |
+        | Set Excel Keep Cell Formatting   |                                                    |
+        | Open Excel                       |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |
+
+        """
+        keepFormatting = keepFormatting is True or str(keepFormatting).lower() == 'true'
+        self._keepFormatting = keepFormatting
+        for session in set(self._sessions.values()) | set([self._session]):
+            session.keepFormatting = keepFormatting
+
+    def set_excel_workbook_cache_limits(self, maxWorkbooks=4, maxBytes=None):
+        """
+        Sets how many parsed workbooks the process wide workbook cache keeps, and optionally the total size of their files.
+        The least recently opened workbooks are dropped first. Setting the maximum number of workbooks to 0 disables the cache.
+
+        A cached workbook is only reused while the modification time and size of its file are unchanged, a file rewritten during the run is parsed again.
+
+        Arguments:
+                |  Max Workbooks (default=4)    | The number of parsed workbooks that are kept in the cache.                                          |
+                |  Max Bytes (default=None)     | The total file size in bytes of the cached workbooks. By default the total size is not limited.     |
+        Example:
+
+        | *Keywords*                        |  *Parameters*    |             |
+        | Set Excel Workbook Cache Limits   |  2               |  104857600  |
+
+        """
+        _workbookCache.configure(int(maxWorkbooks), None if maxBytes in (None, '', 'None') else int(maxBytes))
+
+    def get_excel_workbook_cache_info(self):
+        """
+        Returns a dictionary describing the workbook cache: the cached file paths, their total size in bytes, the configured limits and the number of cache hits and misses.
+
+        Example:
+
+        | *Keywords*                       |  *Parameters*  |
+        | ${info}=                         |  Get Excel Workbook Cache Info  |
+
+        """
+        return _workbookCache.info()
+
+    def clear_excel_workbook_cache(self):
+        """
+        Drops every parsed workbook from the workbook cache and resets its hit and miss counters.
+        The currently open workbook stays open.
+
+        Example:
+
+        | *Keywords*                    |  *Parameters*  |
+        | Clear Excel Workbook Cache    |                |
+
+        """
+        _workbookCache.clear()
+
+    def set_excel_snapshot_cache_directory(self, directory=None):
+        """
+        Sets the directory of the on disk snapshot cache, or turns the cache off when no directory is given.
+        The cache is off by default, unless the EXCEL_SNAPSHOT_CACHE_DIR environment variable names a directory.
+
+        The first time a workbook is opened with the cache on, the values and types of all of its cells are written to a compact
+        snapshot file in the directory. Later opens of the unchanged file, also from other processes such as pabot workers,
+        memory map that snapshot instead of parsing the workbook. Snapshots are keyed by the path, modification time and size of the file.
+
+        The reading keywords work on the snapshot. When a workbook opened from a snapshot is saved, the original file is
+        parsed at that moment so its formatting is kept. Workbooks that are already in the workbook cache are not affected
+        until they are dropped from it, see `Clear Excel Workbook Cache`.
+
+        Arguments:
+                |  Directory (default=None)  | The directory the snapshots are written to and read from. It is created when it does not exist. |
+        Example:
+
+        | *Keywords*                            |  *Parameters*              |
+        | Set Excel Snapshot Cache Directory    |  ${TEMPDIR}${/}snapshots   |
+
+        """
+        _snapshotCache.directory = None if directory in (None, '', 'None') else os.path.abspath(directory)
 
-    def get_sheet_names(self):
+    def enable_excel_performance_stats(self, reset=True):
+        """
+        Starts recording the time spent in the internal phases of the library and counting the cells read and written, the bytes loaded and saved and the workbook cache hits and misses.
+        The statistics are process wide and cover every open workbook. While they are disabled, which is the default, nothing is recorded.
+
+        The recorded phases are open_workbook (parsing a file), load_sheet (parsing a sheet), sheet_snapshot and natsort (preparing the values returned by the getters),
+        copy_workbook, apply_edits and build_workbook (preparing the workbook to save) and write_workbook (writing it to disk).
+
+        Arguments:
+                |  Reset (default=True)  | Clears the statistics recorded earlier. Pass 'False' to keep adding to them.  |
+        Example:
+
+        | *Keywords*                       |  *Parameters*  |
+        | Enable Excel Performance Stats   |                |
+
+        """
+        if reset is True or str(reset).lower() == 'true':
+            stats.reset()
+        stats.enabled = True
+
+    def disable_excel_performance_stats(self):
+        """
+        Stops recording performance statistics. The statistics recorded so far can still be read with `Get Excel Performance Stats`.
+
+        Example:
+
+        | *Keywords*                        |  *Parameters*  |
+        | Disable Excel Performance Stats   |                |
+
+        """
+        stats.enabled = False
+
+    def reset_excel_performance_stats(self):
+        """
+        Clears the recorded performance statistics without enabling or disabling them.
+
+        Example:
+
+        | *Keywords*                      |  *Parameters*  |
+        | Reset Excel Performance Stats   |                |
+
+        """
+        stats.reset()
+
+    def get_excel_performance_stats(self):
+        """
+        Returns a dictionary with the recorded performance statistics. The phases entry maps each phase to its number of calls and its total seconds,
+        the counters entry holds cells_read, cells_written, bytes_loaded, bytes_saved, cache_hits and cache_misses. See `Enable Excel Performance Stats`.
+
+        Example:
+
+        | *Keywords*                     |  *Parameters*  |
+        | ${stats}=                      |  Get Excel Performance Stats  |
+
+        """
+        return stats.snapshot()
+
+    def log_excel_performance_stats(self):
+        """
+        Writes the recorded performance statistics to the Robot log, the slowest phase first.
+
+        Example:
+
+        | *Keywords*                     |  *Parameters*  |
+        | Log Excel Performance Stats    |                |
+
+        """
+        snapshot = stats.snapshot()
+        if not snapshot['enabled']:
+            print 'Excel performance stats are disabled, use Enable Excel Performance Stats to record them'
+        phases = sorted(snapshot['phases'].items(), key=lambda item: item[1]['seconds'], reverse=True)
+        for phase, timing in phases:
+            print '%-16s %6d calls %10.4f s' % (phase, timing['calls'], timing['seconds'])
+        for counter, value in sorted(snapshot['counters'].items()):
+            print '%-16s %d' % (counter, value)
+
+    def get_sheet_names(self, alias=None):
         """
         Returns the names of all the worksheets in the current workbook.
 
+        Arguments:
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*              |  *Parameters*                                      |
@@ -125,13 +878,16 @@ class ExcelLibrary:
         | Get Sheets Names        |                                                    |
 
         """
-        sheetNames = self.wb.sheet_names()
+        session = self._get_session(alias)
+        sheetNames = list(session.sheetNames)
         return sheetNames
 
-    def get_number_of_sheets(self):
+    def get_number_of_sheets(self, alias=None):
         """
         Returns the number of worksheets in the current workbook.
 
+        Arguments:
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*              |  *Parameters*                                      |
@@ -139,15 +895,17 @@ class ExcelLibrary:
         | Get Number of Sheets    |                                                    |
 
         """
-        sheetNum = self.wb.nsheets
+        session = self._get_session(alias)
+        sheetNum = len(session.sheetNames)
         return sheetNum
 
-    def get_column_count(self, sheetname):
+    def get_column_count(self, sheetname, alias=None):
         """
         Returns the specific number of columns of the sheet name specified.
 
         Arguments:
                 |  Sheet Name (string)  | The selected sheet that the column count will be returned from. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*          |  *Parameters*                                      |
@@ -155,15 +913,17 @@ class ExcelLibrary:
         | Get Column Count    |  TestSheet1                                        |
 
         """
-        sheet = self.wb.sheet_by_name(sheetname)
+        session = self._get_session(alias)
+        sheet = session.get_sheet(sheetname)
         return sheet.ncols
 
-    def get_row_count(self, sheetname):
+    def get_row_count(self, sheetname, alias=None):
         """
         Returns the specific number of rows of the sheet name specified.
 
         Arguments:
                 |  Sheet Name (string)  | The selected sheet that the row count will be returned from. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*          |  *Parameters*                                      |
@@ -171,17 +931,21 @@ class ExcelLibrary:
         | Get Row Count       |  TestSheet1                                        |
 
         """
-        sheet = self.wb.sheet_by_name(sheetname)
+        session = self._get_session(alias)
+        sheet = session.get_sheet(sheetname)
         return sheet.nrows
 
-    def get_column_values(self, sheetname, column, includeEmptyCells=True):
+    def get_column_values(self, sheetname, column, includeEmptyCells=True, alias=None, outputFormat='pairs'):
         """
         Returns the specific column values of the sheet name specified.
+        The grid format is read straight from the sheet without making cell names, and keeps empty cells so every value stays in its row.
 
         Arguments:
                 |  Sheet Name (string)                 | The selected sheet that the column values will be returned from.                                                            |
                 |  Column (int)                        | The column integer value that will be used to select the column from which the values will be returned.                     |
                 |  Include Empty Cells (default=True)  | The empty cells will be included by default. To deactivate and only return cells with values, pass 'False' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+                |  Output Format (default=pairs)  | pairs returns (cell name, value) pairs, grid returns the list of values of the column and dict returns a dictionary from cell name to value. |
         Example:
 
         | *Keywords*           |  *Parameters*                                          |
@@ -189,29 +953,26 @@ class ExcelLibrary:
         | Get Column Values    |  TestSheet1                                        | 0 |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        sheet = self.wb.sheet_by_index(my_sheet_index)
-        data = {}
-        for row_index in range(sheet.nrows):
-            cell = cellname(row_index, int(column))
-            value = sheet.cell(row_index, int(column)).value
-            data[cell] = value
-        if includeEmptyCells is True:
-            sortedData = natsort.natsorted(data.items(), key=itemgetter(0))
-            return sortedData
-        else:
-            data = dict([(k, v) for (k, v) in data.items() if v])
-            OrderedData = natsort.natsorted(data.items(), key=itemgetter(0))
-            return OrderedData
-
-    def get_row_values(self, sheetname, row, includeEmptyCells=True):
+        session = self._get_session(alias)
+        outputFormat = _output_format(outputFormat)
+        if outputFormat == 'grid':
+            return session.get_sheet(sheetname).col_values(int(column))
+        data = session.get_sheet_snapshot(sheetname).column_values(int(column))
+        if includeEmptyCells is not True:
+            data = [(k, v) for (k, v) in data if v]
+        return dict(data) if outputFormat == 'dict' else data
+
+    def get_row_values(self, sheetname, row, includeEmptyCells=True, alias=None, outputFormat='pairs'):
         """
         Returns the specific row values of the sheet name specified.
+        The grid format is read straight from the sheet without making cell names, and keeps empty cells so every value stays in its column.
 
         Arguments:
                 |  Sheet Name (string)                 | The selected sheet that the row values will be returned from.                                                               |
                 |  Row (int)                           | The row integer value that will be used to select the row from which the values will be returned.                           |
                 |  Include Empty Cells (default=True)  | The empty cells will be included by default. To deactivate and only return cells with values, pass 'False' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+                |  Output Format (default=pairs)  | pairs returns (cell name, value) pairs, grid returns the list of values of the row and dict returns a dictionary from cell name to value. |
         Example:
 
         | *Keywords*           |  *Parameters*                                          |
@@ -219,28 +980,27 @@ class ExcelLibrary:
         | Get Row Values       |  TestSheet1                                        | 0 |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        sheet = self.wb.sheet_by_index(my_sheet_index)
-        data = {}
-        for col_index in range(sheet.ncols):
-            cell = cellname(int(row), col_index)
-            value = sheet.cell(int(row), col_index).value
-            data[cell] = value
-        if includeEmptyCells is True:
-            sortedData = natsort.natsorted(data.items(), key=itemgetter(0))
-            return sortedData
-        else:
-            data = dict([(k, v) for (k, v) in data.items() if v])
-            OrderedData = natsort.natsorted(data.items(), key=itemgetter(0))
-            return OrderedData
-
-    def get_sheet_values(self, sheetname, includeEmptyCells=True):
+        session = self._get_session(alias)
+        outputFormat = _output_format(outputFormat)
+        if outputFormat == 'grid':
+            return session.get_sheet(sheetname).row_values(int(row))
+        data = session.get_sheet_snapshot(sheetname).row_values(int(row))
+        if includeEmptyCells is not True:
+            data = [(k, v) for (k, v) in data if v]
+        return dict(data) if outputFormat == 'dict' else data
+
+    def get_sheet_values(self, sheetname, includeEmptyCells=True, alias=None, outputFormat='pairs'):
         """
         Returns the values from the sheet name specified.
+        The values of a sheet are read once and reused by the sheet, row and column getters until the sheet is modified or the workbook is closed.
+        The grid format is read straight from the sheet rows without making or sorting cell names, which takes a fraction of the time
+        and memory of the pairs on large sheets. It keeps empty cells so every value stays in its row and column.
 
         Arguments:
                 |  Sheet Name (string)                 | The selected sheet that the cell values will be returned from.                                                              |
                 |  Include Empty Cells (default=True)  | The empty cells will be included by default. To deactivate and only return cells with values, pass 'False' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+                |  Output Format (default=pairs)  | pairs returns (cell name, value) pairs, grid returns a list of rows, each the list of its values and dict returns a dictionary from cell name to value. |
         Example:
 
         | *Keywords*           |  *Parameters*                                      |
@@ -248,28 +1008,29 @@ class ExcelLibrary:
         | Get Sheet Values     |  TestSheet1                                        |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        sheet = self.wb.sheet_by_index(my_sheet_index)
-        data = {}
-        for row_index in range(sheet.nrows):
-            for col_index in range(sheet.ncols):
-                cell = cellname(row_index, col_index)
-                value = sheet.cell(row_index, col_index).value
-                data[cell] = value
-        if includeEmptyCells is True:
-            sortedData = natsort.natsorted(data.items(), key=itemgetter(0))
-            return sortedData
-        else:
-            data = dict([(k, v) for (k, v) in data.items() if v])
-            OrderedData = natsort.natsorted(data.items(), key=itemgetter(0))
-            return OrderedData
-
-    def get_workbook_values(self, includeEmptyCells=True):
+        session = self._get_session(alias)
+        outputFormat = _output_format(outputFormat)
+        if outputFormat == 'grid':
+            sheet = session.get_sheet(sheetname)
+            row_values = sheet.row_values
+            rows = [row_values(row) for row in range(sheet.nrows)]
+            stats.count('cells_read', sheet.nrows * sheet.ncols)
+            return rows
+        data = session.get_sheet_snapshot(sheetname).sheet_values()
+        if includeEmptyCells is not True:
+            data = [(k, v) for (k, v) in data if v]
+        return dict(data) if outputFormat == 'dict' else data
+
+    def get_workbook_values(self, includeEmptyCells=True, alias=None, outputFormat='pairs'):
         """
         Returns the values from each sheet of the current workbook.
+        In the pairs and grid formats each sheet is a list starting with the sheet name, followed by its values as returned by Get Sheet Values.
+        In the dict format a dictionary from sheet name to the dictionary of its values is returned.
 
         Arguments:
                 |  Include Empty Cells (default=True)  | The empty cells will be included by default. To deactivate and only return cells with values, pass 'False' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+                |  Output Format (default=pairs)  | pairs returns (cell name, value) pairs, grid returns each sheet as a list of rows and dict returns a dictionary from cell name to value. |
         Example:
 
         | *Keywords*           |  *Parameters*                                      |
@@ -277,24 +1038,523 @@ class ExcelLibrary:
         | Get Workbook Values  |                                                    |
 
         """
-        sheetData = []
+        session = self._get_session(alias)
+        outputFormat = _output_format(outputFormat)
+        if outputFormat == 'dict':
+            return OrderedDict([(sheet_name, self.get_sheet_values(sheet_name, includeEmptyCells, alias, outputFormat))
+                                for sheet_name in session.sheetNames])
         workbookData = []
-        for sheet_name in self.sheetNames:
-            if includeEmptyCells is True:
-                sheetData = self.get_sheet_values(sheet_name)
-            else:
-                sheetData = self.get_sheet_values(sheet_name, False)
+        for sheet_name in session.sheetNames:
+            sheetData = self.get_sheet_values(sheet_name, includeEmptyCells, alias, outputFormat)
             sheetData.insert(0, sheet_name)
             workbookData.append(sheetData)
         return workbookData
 
-    def read_cell_data_by_name(self, sheetname, cell_name):
+    def get_sheet_values_as_typed_table(self, sheetname, startRow=0, stopRow=None, alias=None):
+        """
+        Returns the values of the sheet name specified as a list of rows, each row being the list of its cell values converted to Python types.
+        Dates are returned as datetime objects using the date system of the workbook and times without a date as time objects, booleans as True or False,
+        error cells as their error text such as #DIV/0! and empty cells as None. Numbers and text are returned as they are stored.
+
+        The cells are converted a column at a time and every distinct date is only converted once.
+
+        Arguments:
+                |  Sheet Name (string)         | The selected sheet that the values will be returned from.                                 |
+                |  Start Row (default=0)       | The first row to return, for example 1 to skip a header row.                              |
+                |  Stop Row (default=None)     | The row to stop before. By default the rows are returned to the last row of the sheet.    |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*                                      |              |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |              |
+        | ${rows}=             |  Get Sheet Values As Typed Table                   |  TestSheet2  |
+
+        """
+        session = self._get_session(alias)
+        sheet = session.get_sheet(sheetname)
+        start = int(startRow)
+        stop = None if stopRow in (None, '', 'None') else int(stopRow)
+        datemode = session.datemode()
+        dates = {}
+        stop = sheet.nrows if stop is None else min(stop, sheet.nrows)
+        with stats.timer('typed_table'):
+            # Rows are read as slices, which is faster than reading columns from xlrd, and turned into columns to convert them.
+            rowIndexes = range(start, stop)
+            columnValues = zip(*[sheet.row_values(row) for row in rowIndexes])
+            columnTypes = zip(*[sheet.row_types(row) for row in rowIndexes])
+            columns = [typed_values(values, types, datemode, dates) for values, types in zip(columnValues, columnTypes)]
+            rows = [list(row) for row in zip(*columns)]
+        stats.count('cells_read', len(rows) * sheet.ncols)
+        return rows
+
+    def get_range_values(self, sheetname, cellRange, alias=None):
+        """
+        Returns the values of a rectangular range of cells as a list of rows, each row being the list of its cell values.
+        The range is given in A1 style, both corners included. Rows and columns past the end of the sheet are left out of the result.
+
+        Arguments:
+                |  Sheet Name (string)   | The selected sheet that the values will be returned from.   |
+                |  Cell Range (string)   | The range of cells, such as A1:F500.                        |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*                                      |          |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |          |
+        | ${rows}=             |  Get Range Values                                  |  TestSheet1  |  A1:B10  |
+
+        """
+        firstRow, firstColumn, lastRow, lastColumn = _parse_cell_range(cellRange)
+        return self._range_values(self._get_session(alias), sheetname, firstRow, firstColumn, lastRow, lastColumn)
+
+    def get_range_values_by_coordinates(self, sheetname, startColumn, startRow, endColumn, endRow, alias=None):
+        """
+        Returns the values of a rectangular range of cells as a list of rows, each row being the list of its cell values.
+        The range is given by the zero based column and row of two opposite corners, both included, in any order like the A1 style range of `Get Range Values`.
+        Rows and columns past the end of the sheet are left out of the result, negative coordinates raise an error.
+
+        Arguments:
+                |  Sheet Name (string)   | The selected sheet that the values will be returned from.   |
+                |  Start Column (int)    | The column of the first cell of the range.                  |
+                |  Start Row (int)       | The row of the first cell of the range.                     |
+                |  End Column (int)      | The column of the last cell of the range.                   |
+                |  End Row (int)         | The row of the last cell of the range.                      |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*                                      |   |   |   |   |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |   |   |   |   |
+        | ${rows}=             |  Get Range Values By Coordinates  |  TestSheet1     | 0 | 0 | 1 | 9 |
+
+        """
+        startColumn, startRow, endColumn, endRow = int(startColumn), int(startRow), int(endColumn), int(endRow)
+        if min(startColumn, startRow, endColumn, endRow) < 0:
+            raise ValueError('The coordinates of a range start at 0, got columns %d to %d and rows %d to %d'
+                             % (startColumn, endColumn, startRow, endRow))
+        return self._range_values(self._get_session(alias), sheetname, min(startRow, endRow), min(startColumn, endColumn),
+                                  max(startRow, endRow), max(startColumn, endColumn))
+
+    def export_sheet_to_csv(self, sheetname, filename, typedDates=False, compress=False, delimiter=',', alias=None):
+        """
+        Writes the values of the sheet name specified to a CSV file, one row at a time, and returns a dictionary with the number of rows and bytes written.
+        The rows are not collected in memory first, so large sheets can be exported without building their values in Robot.
+        Dates are written as numbers unless typed dates are asked for. Text is written as UTF-8.
+
+        Arguments:
+                |  Sheet Name (string)             | The selected sheet that will be exported.                                                              |
+                |  File Name (string)              | The CSV file to write. Files ending in .gz are always compressed.                                      |
+                |  Typed Dates (default=False)     | Writes dates as ISO dates, booleans as TRUE or FALSE and errors as their text. To activate, pass 'True' in the variable. |
+                |  Compress (default=False)        | Writes the file compressed with gzip. To activate, pass 'True' in the variable.                        |
+                |  Delimiter (default=,)           | The character separating the values of a row.                                                          |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*                                      |                   |                  |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |                   |                  |
+        | ${written}=          |  Export Sheet To CSV    |  TestSheet1                 |  TestSheet1.csv   |  typedDates=True |
+
+        """
+        session = self._get_session(alias)
+        sheet = session.get_sheet(sheetname)
+        filename = os.path.abspath(filename)
+        compress = compress is True or str(compress).lower() == 'true' or filename.endswith('.gz')
+        with stats.timer('export_csv'):
+            rows = export_csv(sheet, filename, session.datemode(), typedDates is True or str(typedDates).lower() == 'true',
+                              compress, delimiter)
+        return {'rows': rows, 'bytes': os.path.getsize(filename)}
+
+    def export_workbook_to_json_lines(self, filename, sheetnames=None, typedDates=False, compress=False, alias=None):
+        """
+        Writes the values of every sheet of the current workbook to a JSON Lines file, one row at a time, and returns a dictionary with the number of rows and bytes written.
+        Each line holds an object with the sheet name, the zero based row and the list of values of the row.
+        The rows are not collected in memory first, and the sheets are read one after the other, so `Set Excel Sheet Load Limit` keeps applying.
+
+        Arguments:
+                |  File Name (string)              | The JSON Lines file to write. Files ending in .gz are always compressed.                               |
+                |  Sheet Names (default=None)      | The sheets to export, as a list or as a comma separated string. By default every sheet is exported.    |
+                |  Typed Dates (default=False)     | Writes dates as ISO dates, booleans as true or false, errors as their text and empty cells as null. To activate, pass 'True' in the variable. |
+                |  Compress (default=False)        | Writes the file compressed with gzip. To activate, pass 'True' in the variable.                        |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*                                      |                        |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |                        |
+        | ${written}=          |  Export Workbook To JSON Lines                     |  ExcelRobotTest.jsonl.gz |
+
+        """
+        session = self._get_session(alias)
+        sheetnames = _as_list(sheetnames) or session.sheetNames
+        filename = os.path.abspath(filename)
+        compress = compress is True or str(compress).lower() == 'true' or filename.endswith('.gz')
+        sheets = ((sheetname, session.get_sheet(sheetname)) for sheetname in sheetnames)
+        with stats.timer('export_json_lines'):
+            rows = export_json_lines(sheets, filename, session.datemode(),
+                                     typedDates is True or str(typedDates).lower() == 'true', compress)
+        return {'rows': rows, 'bytes': os.path.getsize(filename)}
+
+    def read_excel_files_in_parallel(self, filenames, sheetnames=None, workers=None, includeEmptyCells=True):
+        """
+        Reads the values of several Excel files in a pool of worker processes and returns them keyed by file name and sheet name.
+        The files do not need to be opened first and the open workbooks are not changed.
+
+        The result maps each file name, in the order given, to a dictionary with a 'sheets' entry holding the values of each sheet
+        in the same form as `Get Sheet Values`, and an 'error' entry that is empty when the file was read or holds the error that stopped it.
+        An error in one file does not stop the other files from being read.
+
+        When sheet names are given only those sheets are read and each sheet of each file is read by its own worker,
+        which also spreads the sheets of a single large file over several processes.
+
+        Arguments:
+                |  File Names (list or string)          | The files to read, as a list or as a comma separated string.                                                  |
+                |  Sheet Names (default=None)           | The sheets to read from every file, as a list or as a comma separated string. By default every sheet is read. |
+                |  Workers (default=None)               | The number of worker processes. By default one per processor, never more than the number of files or sheets to read. |
+                |  Include Empty Cells (default=True)   | The empty cells will be included by default. To deactivate and only return cells with values, pass 'False' in the variable. |
+        Example:
+
+        | *Keywords*                     |  *Parameters*                                    |                       |             |
+        | ${values}=                     |  Read Excel Files In Parallel                    |  expected.xls, actual.xls  |        |
+        | ${values}=                     |  Read Excel Files In Parallel                    |  ${files}             |  Results, Totals  |  workers=4  |
+        | Should Be Empty                |  ${values['actual.xls']['error']}                |                       |             |
+
+        """
+        filenames = _as_list(filenames)
+        sheetnames = _as_list(sheetnames)
+        includeEmptyCells = includeEmptyCells is True
+        owners = []
+        tasks = []
+        for filename in filenames:
+            for sheetname in sheetnames or [None]:
+                owners.append(filename)
+                tasks.append((os.path.abspath(filename), None if sheetname is None else [sheetname], includeEmptyCells))
+        from multiprocessing import Pool, cpu_count
+        workers = min(cpu_count() if workers in (None, '', 'None') else int(workers), len(tasks))
+        with stats.timer('parallel_read'):
+            if workers > 1:
+                pool = Pool(workers)
+                try:
+                    results = pool.map(_read_workbook_task, tasks, chunksize=1)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                results = [_read_workbook_task(task) for task in tasks]
+        files = OrderedDict((filename, {'sheets': OrderedDict(), 'error': None}) for filename in filenames)
+        for filename, (path, sheets, error) in zip(owners, results):
+            files[filename]['sheets'].update(sheets)
+            if error is not None and files[filename]['error'] is None:
+                files[filename]['error'] = error
+        return files
+
+    def iterate_sheet_rows(self, sheetname, chunkSize=1000, includeEmptyCells=True, startRow=0, stopRow=None, alias=None):
+        """
+        Returns an iterator over the rows of the sheet name specified, reading the sheet in chunks instead of loading every cell at once.
+        Each chunk is a list of up to chunk size rows and each row is the list of its cell values.
+        When empty cells are excluded they are dropped from each row and rows without any value are skipped.
+
+        A Robot FOR loop expanding the iterator with @{} collects every chunk in memory first, so large sheets should be consumed chunk by chunk with `Get Next Row Chunk`.
+
+        Arguments:
+                |  Sheet Name (string)                 | The selected sheet that the rows will be returned from.                                                                     |
+                |  Chunk Size (default=1000)           | The maximum number of rows returned in each chunk.                                                                          |
+                |  Include Empty Cells (default=True)  | The empty cells will be included by default. To deactivate and only return cells with values, pass 'False' in the variable. |
+                |  Start Row (default=0)               | The row integer value of the first row that will be returned.                                                               |
+                |  Stop Row (default=None)             | The row integer value at which the iteration stops, this row is not returned. By default the iteration runs to the last row. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*             |  *Parameters*                                      |       |
+        | Open Excel             |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |       |
+        | ${rows}=               |  Iterate Sheet Rows                                |  TestSheet1  |  500  |
+
+        """
+        session = self._get_session(alias)
+        sheet = session.get_sheet(sheetname)
+        stop = None if stopRow in (None, '', 'None') else int(stopRow)
+        return self._iter_row_chunks(sheet, int(chunkSize), includeEmptyCells is True, int(startRow), stop)
+
+    def get_next_row_chunk(self, rowIterator):
+        """
+        Returns the next chunk of rows from an iterator created by `Iterate Sheet Rows`, or an empty list once every row has been returned.
+
+        Arguments:
+                |  Row Iterator  | The iterator returned by the keyword Iterate Sheet Rows.  |
+        Example:
+
+        | *Keywords*   |  *Parameters*         |                      |                 |
+        | ${rows}=     |  Iterate Sheet Rows   |  TestSheet1          |  1000           |
+        | :FOR         |  ${index}             |  IN RANGE            |  1000000        |
+        |              |  ${chunk}=            |  Get Next Row Chunk  |  ${rows}        |
+        |              |  Exit For Loop If     |  not $chunk          |                 |
+        |              |  Log Many             |  @{chunk}            |                 |
+
+        """
+        return next(rowIterator, [])
+
+    def get_sheet_as_records(self, sheetname, headerRow=0, alias=None):
+        """
+        Returns the rows below the header row of the sheet name specified as a list of records, each record mapping the column names of the header to the values of its row.
+        The header is read once and reused until the sheet is modified. A row is only read when its record is used, so large sheets are returned without reading every row up front.
+        The list reads the sheet as it is when a record is used, so cells and rows written after the list was returned are included.
+        Values of a record are read as ${record['Name']}, and a record can be used wherever a dictionary is expected.
+
+        Arguments:
+                |  Sheet Name (string)     | The selected sheet that the records will be returned from.    |
+                |  Header Row (default=0)  | The row holding the column names. The records start at the row below it. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*                                      |              |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |              |
+        | ${records}=          |  Get Sheet As Records                              |  TestSheet1  |
+        | Should Be Equal      |  ${records[0]['Points']}                           |  ${57}       |
+
+        """
+        session = self._get_session(alias)
+        headerRow = int(headerRow)
+        session.get_header(sheetname, headerRow)
+        return RecordList(sheetname, lambda: session.get_sheet(sheetname), lambda: session.get_header(sheetname, headerRow),
+                          headerRow + 1)
+
+    def get_record_by_row(self, sheetname, row, headerRow=0, alias=None):
+        """
+        Returns a row of the sheet name specified as a record mapping the column names of the header to the values of the row.
+
+        Arguments:
+                |  Sheet Name (string)     | The selected sheet that the record will be returned from.     |
+                |  Row (int)               | The row of the sheet to return, counted like the other row arguments and not from the header. |
+                |  Header Row (default=0)  | The row holding the column names.                             |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*                                      |              |     |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |              |     |
+        | ${record}=           |  Get Record By Row                                 |  TestSheet1  |  2  |
+        | Should Be Equal      |  ${record['This is a test sheet']}                 |  User2       |     |
+
+        """
+        session = self._get_session(alias)
+        header = session.get_header(sheetname, int(headerRow))
+        record = Record(header, session.get_sheet(sheetname).row_values(int(row)))
+        stats.count('cells_read', len(header.names))
+        return record
+
+    def build_column_index(self, sheetname, columns, alias=None):
+        """
+        Builds an index of the sheet name specified from the values of one column, or of several columns together, to the rows holding them, and returns the number of distinct values.
+        The index is kept until the sheet is modified, so `Find Rows By Value` looks rows up without reading the sheet again.
+        Calling this keyword is optional, `Find Rows By Value` builds the index the first time it is needed.
+
+        Numbers match whether they are stored as numbers or as text, so 12, 12.0 and '12' are the same value. Dates are matched by the date number that the reading keywords return for them.
+
+        Arguments:
+                |  Sheet Name (string)         | The selected sheet that will be indexed.                                                                 |
+                |  Columns (int or list)       | The column to index, or several columns as a list or a comma separated string to index them as a composite key. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*      |         |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |   |
+        | Build Column Index   |  TestSheet1        |  0      |
+        | Build Column Index   |  TestSheet1        |  0, 2   |
+
+        """
+        session = self._get_session(alias)
+        return len(session.get_column_index(sheetname, self._index_columns(columns)))
+
+    def find_rows_by_value(self, sheetname, columns, value, includeEmptyCells=True, alias=None):
+        """
+        Returns the rows of the sheet name specified whose column holds the value, in the same form as `Get Row Values` and in the order of the sheet.
+        With several columns the value is a list of values, or a comma separated string, that must all match. An empty list is returned when no row matches.
+        The lookup uses the index described in `Build Column Index`, building it when the sheet has not been indexed on these columns since it was last modified.
+
+        Arguments:
+                |  Sheet Name (string)                 | The selected sheet that the rows will be returned from.                                                                     |
+                |  Columns (int or list)               | The column to match, or several columns as a list or a comma separated string.                                            |
+                |  Value                               | The value to look for, or a list of values when several columns are matched.                                             |
+                |  Include Empty Cells (default=True)  | The empty cells will be included by default. To deactivate and only return cells with values, pass 'False' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*      |         |                  |
+        | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |   |   |
+        | ${rows}=             |  Find Rows By Value  |  TestSheet1   |  0   |  Bob           |
+        | ${rows}=             |  Find Rows By Value  |  TestSheet1   |  0, 2  |  Bob, 1234   |
+
+        """
+        session = self._get_session(alias)
+        columns = self._index_columns(columns)
+        values = _as_list(value) if len(columns) > 1 else [value]
+        if len(values) != len(columns):
+            raise ValueError('Expected %d values for columns %s but got %d' % (len(columns), list(columns), len(values)))
+        rows = session.get_column_index(sheetname, columns).get(tuple([_index_key(item) for item in values]), [])
+        snapshot = session.get_sheet_snapshot(sheetname)
+        data = [snapshot.row_values(row) for row in rows]
+        if includeEmptyCells is True:
+            return data
+        else:
+            return [[(k, v) for (k, v) in row_data if v] for row_data in data]
+
+    def get_column_statistics(self, sheetname, column, startRow=0, stopRow=None, alias=None):
+        """
+        Returns a dictionary with the count, sum, min, max and mean of the number cells in the column of the sheet name specified.
+        Cells holding text, dates, booleans or errors and blank cells are skipped. When the column holds no numbers the count and sum are 0 and the other statistics are None.
+        With NumPy installed the column is summarized in one vectorized pass, otherwise plain Python is used.
+
+        Arguments:
+                |  Sheet Name (string)         | The selected sheet that the column will be read from.                                        |
+                |  Column (int)                | The column integer value that will be used to select the column.                             |
+                |  Start Row (default=0)       | The first row to include, for example 1 to skip a header row.                                |
+                |  Stop Row (default=None)     | The row to stop before. By default the column is read to the last row of the sheet.          |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*              |  *Parameters*      |     |     |
+        | Open Excel              |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |   |   |
+        | ${stats}=               |  Get Column Statistics  |  TestSheet1  |  1  |
+        | Should Be Equal As Numbers  |  ${stats['sum']}  |  5235  |     |
+
+        """
+        session = self._get_session(alias)
+        return column_statistics(self._numeric_column(session, sheetname, column, startRow, stopRow))
+
+    def column_should_sum_to(self, sheetname, column, expected, tolerance=0, startRow=0, stopRow=None, alias=None):
+        """
+        Fails unless the number cells in the column of the sheet name specified add up to the expected total, within the tolerance.
+        Cells that do not hold numbers are skipped as in `Get Column Statistics`.
+
+        Arguments:
+                |  Sheet Name (string)         | The selected sheet that the column will be read from.                                        |
+                |  Column (int)                | The column integer value that will be used to select the column.                             |
+                |  Expected (number)           | The expected total.                                                                          |
+                |  Tolerance (default=0)       | The largest difference from the expected total that is still accepted.                       |
+                |  Start Row (default=0)       | The first row to include, for example 1 to skip a header row.                                |
+                |  Stop Row (default=None)     | The row to stop before. By default the column is read to the last row of the sheet.          |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*              |  *Parameters*      |     |        |          |
+        | Open Excel              |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |   |   |   |
+        | Column Should Sum To    |  TestSheet1        |  1  |  5235  |  0.005   |
+
+        """
+        session = self._get_session(alias)
+        total = column_statistics(self._numeric_column(session, sheetname, column, startRow, stopRow))['sum']
+        if abs(total - float(expected)) > float(tolerance):
+            raise AssertionError('Column %s of sheet %s sums to %r, expected %s within %s'
+                                 % (xlrd.colname(int(column)), sheetname, total, expected, tolerance))
+
+    def columns_should_be_equal_within_tolerance(self, sheetname, column, otherColumn, tolerance=0, otherSheetname=None,
+                                                 startRow=0, stopRow=None, alias=None, otherAlias=None):
+        """
+        Fails when the number cells of two columns differ, row by row, by more than the tolerance, or when a row holds a number in only one of them.
+        Rows where neither column holds a number, such as headers and blank rows, are skipped. The columns can be in different sheets and in different open workbooks.
+        The failure message lists the first ten differing cells and the number of differences.
+
+        Arguments:
+                |  Sheet Name (string)              | The sheet of the first column.                                                              |
+                |  Column (int)                     | The first column.                                                                           |
+                |  Other Column (int)               | The column compared with the first column.                                                  |
+                |  Tolerance (default=0)            | The largest difference between two cells that is still accepted.                            |
+                |  Other Sheet Name (default=None)  | The sheet of the other column. By default the sheet of the first column.                    |
+                |  Start Row (default=0)            | The first row to compare, for example 1 to skip a header row.                               |
+                |  Stop Row (default=None)          | The row to stop before. By default the columns are compared to the last row.                |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+                |  Other Alias (default=None)       | The alias of the workbook of the other column. By default the workbook of the first column. |
+        Example:
+
+        | *Keywords*                                  |  *Parameters*  |     |     |        |                          |
+        | Columns Should Be Equal Within Tolerance    |  Results       |  2  |  3  |  0.01  |                          |
+        | Columns Should Be Equal Within Tolerance    |  Results       |  2  |  2  |  0.01  |  alias=actual  |  otherAlias=expected  |
+
+        """
+        session = self._get_session(alias)
+        otherSession = session if otherAlias is None else self._get_session(otherAlias)
+        otherSheetname = sheetname if otherSheetname in (None, '', 'None') else otherSheetname
+        differences = column_differences(self._numeric_column(session, sheetname, column, startRow, stopRow),
+                                         self._numeric_column(otherSession, otherSheetname, otherColumn, startRow, stopRow),
+                                         float(tolerance))
+        if differences:
+            start = int(startRow)
+            details = ', '.join(['%s=%s != %s=%s' % (xlrd.cellname(start + row, int(column)), value,
+                                                     xlrd.cellname(start + row, int(otherColumn)), other)
+                                 for (row, value, other) in differences[:10]])
+            raise AssertionError('%d cells differ by more than %s: %s' % (len(differences), tolerance, details))
+
+    def get_excel_sheet_differences(self, sheetname, expectedAlias, expectedSheetname=None, keyColumns=None, tolerance=0,
+                                    ignoreOrder=False, alias=None):
+        """
+        Compares a sheet of the current workbook with a sheet of the workbook opened with the expected alias and returns the differences as a list of short descriptions.
+        An empty list is returned when the sheets are equal.
+
+        By default rows are compared by position. With key columns, rows are matched by the values of those columns wherever they are in the sheets,
+        and rows whose key is only found in one of the sheets are reported as missing or unexpected. With ignoreOrder and no key columns, rows are matched by their whole contents,
+        and a row without an equal row is matched with a row whose numbers all differ by no more than the tolerance.
+        Rows that are equal as a whole are skipped, only the other rows are compared cell by cell.
+
+        Arguments:
+                |  Sheet Name (string)                 | The sheet of the current, or actual, workbook.                                                              |
+                |  Expected Alias (string)             | The alias of the open workbook holding the expected values.                                                 |
+                |  Expected Sheet Name (default=None)  | The sheet of the expected workbook. By default the sheet with the same name.                                |
+                |  Key Columns (default=None)          | The column, or a list or comma separated string of columns, identifying a row.                              |
+                |  Tolerance (default=0)               | The largest difference between two numbers that is still accepted.                                          |
+                |  Ignore Order (default=False)        | Matches rows by their whole contents when no key columns are given. To activate, pass 'True' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*           |  *Parameters*        |                  |                  |                 |
+        | Open Excel           |  expected.xls        |  alias=expected  |                  |                 |
+        | Open Excel           |  actual.xls          |  alias=actual    |                  |                 |
+        | ${differences}=      |  Get Excel Sheet Differences  |  Results  |  expected  |  keyColumns=0  |
+
+        """
+        session = self._get_session(alias)
+        expectedSession = self._get_session(expectedAlias)
+        expectedSheetname = sheetname if expectedSheetname in (None, '', 'None') else expectedSheetname
+        keyColumns = None if keyColumns in (None, '', 'None') else self._index_columns(keyColumns)
+        with stats.timer('sheet_differences'):
+            return sheet_differences(session.get_sheet(sheetname), expectedSession.get_sheet(expectedSheetname),
+                                     keyColumns, tolerance, ignoreOrder is True or str(ignoreOrder).lower() == 'true',
+                                     _index_key)
+
+    def excel_sheets_should_be_equal(self, sheetname, expectedAlias, expectedSheetname=None, keyColumns=None, tolerance=0,
+                                     ignoreOrder=False, maxReported=20, alias=None):
+        """
+        Fails when a sheet of the current workbook differs from a sheet of the workbook opened with the expected alias.
+        The sheets are compared as described in `Get Excel Sheet Differences` and the failure message lists the number of differences and the first of them.
+
+        Arguments:
+                |  Sheet Name (string)                 | The sheet of the current, or actual, workbook.                                                              |
+                |  Expected Alias (string)             | The alias of the open workbook holding the expected values.                                                 |
+                |  Expected Sheet Name (default=None)  | The sheet of the expected workbook. By default the sheet with the same name.                                |
+                |  Key Columns (default=None)          | The column, or a list or comma separated string of columns, identifying a row.                              |
+                |  Tolerance (default=0)               | The largest difference between two numbers that is still accepted.                                          |
+                |  Ignore Order (default=False)        | Matches rows by their whole contents when no key columns are given. To activate, pass 'True' in the variable. |
+                |  Max Reported (default=20)           | The number of differences listed in the failure message.                                                    |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*                      |  *Parameters*   |            |                  |                 |
+        | Excel Sheets Should Be Equal    |  Results        |  expected  |                  |                 |
+        | Excel Sheets Should Be Equal    |  Results        |  expected  |  keyColumns=0, 1 |  tolerance=0.01 |
+
+        """
+        differences = self.get_excel_sheet_differences(sheetname, expectedAlias, expectedSheetname, keyColumns, tolerance,
+                                                       ignoreOrder, alias)
+        if differences:
+            shown = differences[:int(maxReported)]
+            more = len(differences) - len(shown)
+            raise AssertionError('Sheet %s has %d differences:\n%s%s' % (sheetname, len(differences), '\n'.join(shown),
+                                                                        '\n... and %d more' % more if more else ''))
+
+    def read_cell_data_by_name(self, sheetname, cell_name, alias=None):
         """
         Uses the cell name to return the data from that cell.
+        The cell name is an A1 style reference, absolute references such as $B$2 and multi-letter columns such as AA10 are supported.
+        A cell name that is malformed or lies outside of the sheet raises an error.
 
         Arguments:
                 |  Sheet Name (string)  | The selected sheet that the cell value will be returned from.  |
                 |  Cell Name (string)   | The selected cell name that the value will be returned from.   |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                             |
@@ -302,16 +1562,17 @@ class ExcelLibrary:
         | Get Cell Data        |  TestSheet1                                        |  A2  |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        sheet = self.wb.sheet_by_index(my_sheet_index)
-        for row_index in range(sheet.nrows):
-            for col_index in range(sheet.ncols):
-                cell = cellname(row_index, col_index)
-                if cell_name == cell:
-                    cellValue = sheet.cell(row_index, col_index).value
+        session = self._get_session(alias)
+        sheet = session.get_sheet(sheetname)
+        row_index, col_index = _parse_cell_name(cell_name)
+        if row_index >= sheet.nrows or col_index >= sheet.ncols:
+            raise ValueError("Cell '%s' is outside of sheet '%s' which has %d rows and %d columns"
+                             % (cell_name, sheetname, sheet.nrows, sheet.ncols))
+        cellValue = sheet.cell(row_index, col_index).value
+        stats.count('cells_read')
         return cellValue
 
-    def read_cell_data_by_coordinates(self, sheetname, column, row):
+    def read_cell_data_by_coordinates(self, sheetname, column, row, alias=None):
         """
         Uses the column and row to return the data from that cell.
 
@@ -319,6 +1580,7 @@ class ExcelLibrary:
                 |  Sheet Name (string)  | The selected sheet that the cell value will be returned from.         |
                 |  Column (int)         | The column integer value that the cell value will be returned from.   |
                 |  Row (int)            | The row integer value that the cell value will be returned from.      |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*     |  *Parameters*                                              |
@@ -326,29 +1588,32 @@ class ExcelLibrary:
         | Read Cell      |  TestSheet1                                        | 0 | 0 |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        sheet = self.wb.sheet_by_index(my_sheet_index)
+        session = self._get_session(alias)
+        sheet = session.get_sheet(sheetname)
         cellValue = sheet.cell(int(row), int(column)).value
+        stats.count('cells_read')
         return cellValue
 
-    def check_cell_type(self, sheetname, column, row):
+    def check_cell_type(self, sheetname, column, row, alias=None):
         """
-        Checks the type of value that is within the cell of the sheet name selected.
+        Checks the type of value that is within the cell of the sheet name selected, logs it and returns it as one of number, string, date, boolean, error, blank or empty.
 
         Arguments:
                 |  Sheet Name (string)  | The selected sheet that the cell type will be checked from.          |
                 |  Column (int)         | The column integer value that will be used to check the cell type.   |
                 |  Row (int)            | The row integer value that will be used to check the cell type.      |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                              |
         | Open Excel           |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |   |   |
         | Check Cell Type      |  TestSheet1                                        | 0 | 0 |
+        | ${type}=             |  Check Cell Type   |  TestSheet1                   | 0 | 0 |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        sheet = self.wb.sheet_by_index(my_sheet_index)
-        cell = self.wb.get_sheet(my_sheet_index).cell(int(row), int(column))
+        session = self._get_session(alias)
+        sheet = session.get_sheet(sheetname)
+        cell = sheet.cell(int(row), int(column))
         if cell.ctype is XL_CELL_NUMBER:
             print "The cell value is a number"
         elif cell.ctype is XL_CELL_TEXT:
@@ -364,9 +1629,10 @@ class ExcelLibrary:
         elif cell.ctype is XL_CELL_EMPTY:
             print "The cell value is empty"
         else:
-            print error_text_from_code[sheet.cell(row, column).value]
+            print xlrd.error_text_from_code[sheet.cell(row, column).value]
+        return _CELL_TYPE_NAMES.get(cell.ctype)
 
-    def put_number_to_cell(self, sheetname, column, row, value):
+    def put_number_to_cell(self, sheetname, column, row, value, alias=None):
         """
         Using the sheet name the value of the indicated cell is set to be the number given in the parameter.
 
@@ -375,6 +1641,7 @@ class ExcelLibrary:
                 |  Column (int)        | The column integer value that will be used to modify the cell.                                    |
                 |  Row (int)           | The row integer value that will be used to modify the cell.                                       |
                 |  Value (int)         | The integer value that will be added to the specified sheetname at the specified column and row.  |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                                         |
@@ -382,18 +1649,10 @@ class ExcelLibrary:
         | Put Number To Cell   |  TestSheet1                                        |  0  |  0  |  34  |
 
         """
-        if self.wb:
-            my_sheet_index = self.sheetNames.index(sheetname)
-            # cell = self.wb.get_sheet(my_sheet_index).cell(int(row), int(column))
-            # if cell.ctype is XL_CELL_NUMBER:
-        if not self.tb:
-            self.wb.sheets()
-            self.tb = copy(self.wb)
-        if self.tb:
-            plain = easyxf('')
-            self.tb.get_sheet(my_sheet_index).write(int(row), int(column), float(value), plain)
+        session = self._get_session(alias)
+        session.write_cell(sheetname, column, row, float(value))
 
-    def put_string_to_cell(self, sheetname, column, row, value):
+    def put_string_to_cell(self, sheetname, column, row, value, alias=None):
         """
         Using the sheet name the value of the indicated cell is set to be the string given in the parameter.
 
@@ -402,6 +1661,7 @@ class ExcelLibrary:
                 |  Column (int)        | The column integer value that will be used to modify the cell.                                    |
                 |  Row (int)           | The row integer value that will be used to modify the cell.                                       |
                 |  Value (string)      | The string value that will be added to the specified sheetname at the specified column and row.   |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                                           |
@@ -409,19 +1669,10 @@ class ExcelLibrary:
         | Put String To Cell   |  TestSheet1                                        |  0  |  0  |  Hello |
 
         """
-        if self.wb:
-            my_sheet_index = self.sheetNames.index(sheetname)
-            # cell = self.wb.get_sheet(my_sheet_index).cell(int(row), int(column))
-            # if cell.ctype is XL_CELL_TEXT:
-
-        if not self.tb:
-            self.wb.sheets()
-            self.tb = copy(self.wb)
-        if self.tb:
-            plain = easyxf('')
-            self.tb.get_sheet(my_sheet_index).write(int(row), int(column), value, plain)
+        session = self._get_session(alias)
+        session.write_cell(sheetname, column, row, value)
 
-    def put_date_to_cell(self, sheetname, column, row, value):
+    def put_date_to_cell(self, sheetname, column, row, value, alias=None):
         """
         Using the sheet name the value of the indicated cell is set to be the date given in the parameter.
 
@@ -430,6 +1681,7 @@ class ExcelLibrary:
                 |  Column (int)                      | The column integer value that will be used to modify the cell.                                                     |
                 |  Row (int)                         | The row integer value that will be used to modify the cell.                                                        |
                 |  Value (int)                       | The integer value containing a date that will be added to the specified sheetname at the specified column and row. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                                               |
@@ -437,24 +1689,70 @@ class ExcelLibrary:
         | Put Date To Cell     |  TestSheet1                                        |  0  |  0  |  12.3.1999 |
 
         """
-        if self.wb:
-            my_sheet_index = self.sheetNames.index(sheetname)
-            # cell = self.wb.get_sheet(my_sheet_index).cell(int(row), int(column))
-            # if cell.ctype is XL_CELL_DATE:
-            if not self.tb:
-                self.wb.sheets()
-                self.tb = copy(self.wb)
-        if self.tb:
-            print(value)
-            # dt = value.split('.')
-            # dti = [int(dt[2]), int(dt[1]), int(dt[0])]
-            # print(dt, dti)
-            ymd = datetime.strptime(value, '%d-%m-%Y')
-            print(ymd)
-            plain = easyxf('', num_format_str='d.M.yyyy')
-            self.tb.get_sheet(my_sheet_index).write(int(row), int(column), ymd, plain)
-
-    def modify_cell_with(self, sheetname, column, row, op, val):
+        session = self._get_session(alias)
+        print(value)
+        # dt = value.split('.')
+        # dti = [int(dt[2]), int(dt[1]), int(dt[0])]
+        # print(dt, dti)
+        ymd = datetime.strptime(value, '%d-%m-%Y')
+        print(ymd)
+        session.write_cell(sheetname, column, row, ymd, DATE_FORMAT)
+
+    def put_values_to_range(self, sheetname, column, row, values, columnTypes=None, columnFormats=None, alias=None):
+        """
+        Using the sheet name a block of cells starting at the indicated cell is set to the given rows of values in a single pass.
+        Each column can be given a type that converts its values and a number format, the styles for these formats are built once and shared with the single cell keywords.
+
+        Arguments:
+                |  Sheet Name (string)               | The selected sheet that the cells will be modified from.                                                                            |
+                |  Column (int)                      | The column integer value of the top left cell of the range.                                                                         |
+                |  Row (int)                         | The row integer value of the top left cell of the range.                                                                            |
+                |  Values (list)                     | A list of rows, each row being a list of the values written to consecutive columns.                                                 |
+                |  Column Types (default=None)       | A list, or comma separated string, with one of number, string or date for each column. Dates are given as d-m-Y or as dates, empty values are written as empty cells. Values of other columns are written as given. |
+                |  Column Formats (default=None)     | A list, or comma separated string, with an Excel number format such as 0.00 or d.M.yyyy for each column.                            |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*            |  *Parameters*  |     |     |               |                           |
+        | Put Values To Range   |  TestSheet1    |  0  |  1  |  ${rows}      |  string, number, date     |
+
+        """
+        session = self._get_session(alias)
+        session.sheetNames.index(sheetname)
+        columnTypes = _as_list(columnTypes) or []
+        columnFormats = _as_list(columnFormats) or []
+        converters = []
+        formats = []
+        for index in range(max([len(values_row) for values_row in values] or [0])):
+            columnType = columnTypes[index].lower() if index < len(columnTypes) and columnTypes[index] else None
+            columnFormat = columnFormats[index] if index < len(columnFormats) and columnFormats[index] else ''
+            if columnType == 'number':
+                converters.append(_range_number)
+            elif columnType == 'date':
+                converters.append(_range_date)
+                columnFormat = columnFormat or DATE_FORMAT
+            elif columnType in (None, 'string'):
+                converters.append(None)
+            else:
+                raise ValueError("Unknown column type '%s', expected number, string or date" % columnTypes[index])
+            formats.append(columnFormat)
+        write = session.journal.write
+        row = int(row)
+        column = int(column)
+        for row_offset, values_row in enumerate(values):
+            for col_offset, value in enumerate(values_row):
+                convert = converters[col_offset]
+                columnFormat = formats[col_offset]
+                if convert is not None:
+                    value = convert(value)
+                elif isinstance(value, datetime) and not columnFormat:
+                    columnFormat = DATE_FORMAT
+                write(sheetname, row + row_offset, column + col_offset, value, columnFormat)
+        session.invalidate_sheet_cache(sheetname)
+        if stats.enabled:
+            stats.count('cells_written', sum([len(values_row) for values_row in values]))
+
+    def modify_cell_with(self, sheetname, column, row, op, val, alias=None):
         """
         Using the sheet name a cell is modified with the given operation and value.
 
@@ -464,6 +1762,7 @@ class ExcelLibrary:
                 |  Row (int)            | The row integer value that will be used to modify the cell.                                              |
                 |  Operation (operator) | The operation that will be performed on the value within the cell located by the column and row values.  |
                 |  Value (int)          | The integer value that will be used in conjuction with the operation parameter.                          |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                                               |
@@ -471,18 +1770,14 @@ class ExcelLibrary:
         | Modify Cell With     |  TestSheet1                                        |  0  |  0  |  *  |  56  |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        cell = self.wb.get_sheet(my_sheet_index).cell(int(row), int(column))
+        session = self._get_session(alias)
+        cell = session.get_sheet(sheetname).cell(int(row), int(column))
         curval = cell.value
         if cell.ctype is XL_CELL_NUMBER:
-            self.wb.sheets()
-            if not self.tb:
-                self.tb = copy(self.wb)
-            plain = easyxf('')
             modexpr = str(curval) + op + val
-            self.tb.get_sheet(my_sheet_index).write(int(row), int(column), eval(modexpr), plain)
+            session.write_cell(sheetname, column, row, eval(modexpr))
 
-    def add_to_date(self, sheetname, column, row, numdays):
+    def add_to_date(self, sheetname, column, row, numdays, alias=None):
         """
         Using the sheet name the number of days are added to the date in the indicated cell.
 
@@ -491,6 +1786,7 @@ class ExcelLibrary:
                 |  Column (int)                    | The column integer value that will be used to modify the cell.                                                                   |
                 |  Row (int)                       | The row integer value that will be used to modify the cell.                                                                      |
                 |  Number of Days (int)            | The integer value containing the number of days that will be added to the specified sheetname at the specified column and row.   |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                                        |
@@ -498,18 +1794,14 @@ class ExcelLibrary:
         | Add To Date          |  TestSheet1                                        |  0  |  0  |  4  |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        cell = self.wb.get_sheet(my_sheet_index).cell(int(row), int(column))
+        session = self._get_session(alias)
+        cell = session.get_sheet(sheetname).cell(int(row), int(column))
         if cell.ctype is XL_CELL_DATE:
-            self.wb.sheets()
-            if not self.tb:
-                self.tb = copy(self.wb)
-            curval = datetime(*xldate_as_tuple(cell.value, self.wb.datemode))
+            curval = datetime(*xlrd.xldate_as_tuple(cell.value, session.datemode()))
             newval = curval + timedelta(int(numdays))
-            plain = easyxf('', num_format_str='d.M.yyyy')
-            self.tb.get_sheet(my_sheet_index).write(int(row), int(column), newval, plain)
+            session.write_cell(sheetname, column, row, newval, DATE_FORMAT)
 
-    def subtract_from_date(self, sheetname, column, row, numdays):
+    def subtract_from_date(self, sheetname, column, row, numdays, alias=None):
         """
         Using the sheet name the number of days are subtracted from the date in the indicated cell.
 
@@ -518,6 +1810,7 @@ class ExcelLibrary:
                 |  Column (int)                    | The column integer value that will be used to modify the cell.                                                                          |
                 |  Row (int)                       | The row integer value that will be used to modify the cell.                                                                             |
                 |  Number of Days (int)            | The integer value containing the number of days that will be subtracted from the specified sheetname at the specified column and row.   |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                                        |
@@ -525,25 +1818,23 @@ class ExcelLibrary:
         | Subtract From Date   |  TestSheet1                                        |  0  |  0  |  7  |
 
         """
-        my_sheet_index = self.sheetNames.index(sheetname)
-        cell = self.wb.get_sheet(my_sheet_index).cell(int(row), int(column))
+        session = self._get_session(alias)
+        cell = session.get_sheet(sheetname).cell(int(row), int(column))
         if cell.ctype is XL_CELL_DATE:
-            self.wb.sheets()
-            if not self.tb:
-                self.tb = copy(self.wb)
-            curval = datetime(*xldate_as_tuple(cell.value, self.wb.datemode))
+            curval = datetime(*xlrd.xldate_as_tuple(cell.value, session.datemode()))
             newval = curval - timedelta(int(numdays))
-            plain = easyxf('', num_format_str='d.M.yyyy')
-            self.tb.get_sheet(my_sheet_index).write(int(row), int(column), newval, plain)
+            session.write_cell(sheetname, column, row, newval, DATE_FORMAT)
 
-    def save_excel(self, filename, useTempDir=False):
+    def save_excel(self, filename, useTempDir=False, alias=None):
         """
         Saves the Excel file indicated by file name, the useTempDir can be set to true if the user needs the file saved in the temporary directory.
+        The writing keywords only record their changes, the workbook that is written to disk is built from the opened file and those changes when it is saved.
         If the boolean useTempDir is set to true, depending on the operating system of the computer running the test the file will be saved in the Temp directory if the operating system is Windows or tmp directory if it is not.
 
         Arguments:
                 |  File Name (string)                      | The name of the of the file to be saved.  |
                 |  Use Temporary Directory (default=False) | The file will not be saved in a temporary directory by default. To activate and save the file in a temporary directory, pass 'True' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                      |
@@ -551,18 +1842,99 @@ class ExcelLibrary:
         | Save Excel           |  NewExcelRobotTest.xls                             |
 
         """
+        session = self._get_session(alias)
         if useTempDir is True:
             print '*DEBUG* Got fname %s' % filename
-            self.tb.save(os.path.join("/", self.tmpDir, filename))
-        else:
-            self.tb.save(filename)
+            filename = os.path.join("/", self.tmpDir, filename)
+        self._save(session, filename)
 
-    def save_excel_current_directory(self, filename):
+    def save_excel_if_modified(self, filename, useTempDir=False, alias=None):
+        """
+        Saves the Excel file like `Save Excel` and returns True when it was written, or False when it was not written because it already holds the workbook.
+        That is the case when the workbook was opened from or last saved to this file, it has not been written to since and the file has not changed on disk.
+
+        Arguments:
+                |  File Name (string)                      | The name of the of the file to be saved.  |
+                |  Use Temporary Directory (default=False) | The file will not be saved in a temporary directory by default. To activate and save the file in a temporary directory, pass 'True' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*             |  *Parameters*                                      |
+        | Open Excel             |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |
+        | ${written}=            |  Save Excel If Modified  |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |
+
+        """
+        session = self._get_session(alias)
+        if useTempDir is True:
+            filename = os.path.join("/", self.tmpDir, filename)
+        return self._save(session, filename)
+
+    def get_modified_sheet_names(self, alias=None):
+        """
+        Returns the names of the sheets that were written to or added since the workbook was opened or last saved.
+
+        Arguments:
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*             |  *Parameters*                 |
+        | Put String To Cell     |  TestSheet1  |  0  |  0  |  x |
+        | ${sheets}=             |  Get Modified Sheet Names     |
+
+        """
+        return self._get_session(alias).modified_sheets()
+
+    def save_excel_in_background(self, filename, useTempDir=False, alias=None):
+        """
+        Saves the Excel file like `Save Excel`, but only builds the workbook to save before returning and writes it to the file on a background thread.
+        Writing to the workbook afterwards does not change the file being saved. The file is written under a temporary name and renamed when it is complete,
+        so it never holds a partly written workbook.
+
+        Use `Wait For Excel Save` before using the file. An error while writing the file fails `Wait For Excel Save`, or `Close Excel` when it is not called.
+        A save to the same file as a save that is still running waits for it first.
+
+        Arguments:
+                |  File Name (string)                      | The name of the of the file to be saved.  |
+                |  Use Temporary Directory (default=False) | The file will not be saved in a temporary directory by default. To activate and save the file in a temporary directory, pass 'True' in the variable. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*                |  *Parameters*                                      |
+        | Open Excel                |  C:\\Python27\\ExcelRobotTest\\ExcelRobotTest.xls  |
+        | Save Excel In Background  |  NewExcelRobotTest.xls                             |
+        | Wait For Excel Save       |                                                    |
+
+        """
+        session = self._get_session(alias)
+        if useTempDir is True:
+            filename = os.path.join("/", self.tmpDir, filename)
+        if not session.save_in_background(filename):
+            print '*INFO* %s already holds the workbook, it is not written again' % filename
+
+    def wait_for_excel_save(self, timeout=None, alias=None):
+        """
+        Waits until the saves of the workbook started with `Save Excel In Background` have finished, and fails with the error of a save that did not succeed.
+
+        Arguments:
+                |  Timeout (default=None)  | The number of seconds to wait before failing. By default there is no limit. |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
+        Example:
+
+        | *Keywords*                |  *Parameters*            |
+        | Save Excel In Background  |  NewExcelRobotTest.xls   |
+        | Wait For Excel Save       |  timeout=60              |
+
+        """
+        session = self._get_session(alias)
+        session.wait_for_saves(timeout=None if timeout in (None, '', 'None') else float(timeout))
+
+    def save_excel_current_directory(self, filename, alias=None):
         """
         Saves the Excel file from the current directory using the directory the test has been run from.
 
         Arguments:
                 |  File Name (string)    | The name of the of the file to be saved.  |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*                     |  *Parameters*                                      |
@@ -570,16 +1942,19 @@ class ExcelLibrary:
         | Save Excel Current Directory   |  NewTestCases.xls                                  |
 
         """
+        session = self._get_session(alias)
         workdir = os.getcwd()
         print '*DEBUG* Got fname %s' % filename
-        self.tb.save(os.path.join(workdir, filename))
+        self._save(session, os.path.join(workdir, filename))
 
-    def add_new_sheet(self, newsheetname):
+    def add_new_sheet(self, newsheetname, alias=None):
         """
         Creates and appends new Excel worksheet using the new sheet name to the current workbook.
+        Cells written before or after adding the sheet are all kept, and the new sheet can be written to and read from before the workbook is saved.
 
         Arguments:
                 |  New Sheet name (string)  | The name of the new sheet added to the workbook.  |
+                |  Alias (default=None)  | The alias of the workbook to use. By default the current workbook is used. |
         Example:
 
         | *Keywords*           |  *Parameters*                                      |
@@ -587,15 +1962,19 @@ class ExcelLibrary:
         | Add New Sheet        |  NewSheet                                          |
 
         """
-        self.tb = copy(self.wb)
-        self.tb.add_sheet(newsheetname)
+        session = self._get_session(alias)
+        if newsheetname in session.sheetNames:
+            raise ValueError("The workbook already has a sheet named '%s'" % newsheetname)
+        session.journal.add_sheet(newsheetname)
+        session.sheetNames.append(newsheetname)
 
-    def create_excel_workbook(self, newsheetname):
+    def create_excel_workbook(self, newsheetname, alias=None):
         """
         Creates a new Excel workbook
 
         Arguments:
                 |  New Sheet Name (string)  | The name of the new sheet added to the new workbook.  |
+                |  Alias (default=None)  | The alias the workbook can be selected with by `Switch Excel` and by the alias argument of other keywords. |
         Example:
 
         | *Keywords*           |  *Parameters*                                      |
@@ -603,6 +1982,73 @@ class ExcelLibrary:
         | Create Excel         |  NewExcelSheet                                     |
 
         """
-        self.tb = Workbook()
-        self.tb.add_sheet(newsheetname)
-
+        session = _ExcelSession(sheetNames=[newsheetname])
+        session.journal.add_sheet(newsheetname)
+        self._register_session(session, alias)
+
+    def _iter_row_chunks(self, sheet, chunkSize, includeEmptyCells, start, stop):
+        chunk = []
+        for values, types in iter_sheet_rows(sheet, start, stop):
+            if not includeEmptyCells:
+                values = [value for (value, ctype) in zip(values, types)
+                          if ctype is not XL_CELL_EMPTY and ctype is not XL_CELL_BLANK]
+                if not values:
+                    continue
+            chunk.append(values)
+            if len(chunk) >= chunkSize:
+                if stats.enabled:
+                    stats.count('cells_read', sum([len(values) for values in chunk]))
+                yield chunk
+                chunk = []
+        if chunk:
+            if stats.enabled:
+                stats.count('cells_read', sum([len(values) for values in chunk]))
+            yield chunk
+
+    def _range_values(self, session, sheetname, firstRow, firstColumn, lastRow, lastColumn):
+        sheet = session.get_sheet(sheetname)
+        with stats.timer('range_values'):
+            # Row slices are taken straight from the sheet, so no cell objects or cell names are made.
+            rows = [sheet.row_values(row, firstColumn, lastColumn + 1) for row in range(firstRow, min(lastRow + 1, sheet.nrows))]
+        if stats.enabled:
+            stats.count('cells_read', sum([len(row) for row in rows]))
+        return rows
+
+    def _numeric_column(self, session, sheetname, column, startRow, stopRow):
+        sheet = session.get_sheet(sheetname)
+        with stats.timer('column_statistics'):
+            return numeric_column(sheet, int(column), int(startRow), None if stopRow in (None, '', 'None') else int(stopRow))
+
+    def _index_columns(self, columns):
+        if isinstance(columns, (int, long)):
+            return (columns,)
+        return tuple([int(column) for column in _as_list(columns)])
+
+    def _get_session(self, alias=None):
+        if alias is None:
+            return self._session
+        try:
+            return self._sessions[alias]
+        except KeyError:
+            raise ValueError("No workbook has been opened with the alias '%s'" % alias)
+
+    def _save(self, session, filename):
+        written = session.save(filename)
+        if not written:
+            print '*INFO* %s already holds the workbook, it is not written again' % filename
+        return written
+
+    def _open_session(self, path, alias, readOnly, fileName=None):
+        readOnly = readOnly is True or str(readOnly).lower() == 'true'
+        sourceFile = _file_state(path)
+        wb = _workbookCache.open(path, formattingInfo=not readOnly)
+        self._register_session(_ExcelSession(wb, wb.sheet_names(), fileName, os.path.abspath(path), readOnly, sourceFile),
+                               alias)
+
+    def _register_session(self, session, alias):
+        session.maxLoadedSheets = self._maxLoadedSheets
+        session.keepFormatting = self._keepFormatting
+        # Workbooks without an alias can only be used while they are the current one, so they are not kept.
+        if alias is not None:
+            self._sessions[alias] = session
+        self._session = session
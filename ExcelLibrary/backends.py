@@ -0,0 +1,533 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import os
+import tempfile
+from array import array
+from copy import copy
+from datetime import date, datetime, time, timedelta
+from io import BytesIO
+from celltypes import XL_CELL_NUMBER, XL_CELL_DATE, XL_CELL_TEXT, XL_CELL_BOOLEAN, \
+    XL_CELL_ERROR, XL_CELL_BLANK, XL_CELL_EMPTY
+from lazyimport import LazyModule, load, optional_module
+from perfstats import stats
+
+# The workbook libraries are imported when a workbook is first opened or saved, openpyxl only for .xlsx files.
+xlrd = LazyModule('xlrd')
+xlwt = LazyModule('xlwt')
+xlutils_filter = LazyModule('xlutils.filter')
+
+DATE_FORMAT = 'd.M.yyyy'
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+
+_styleCache = {}
+_EPOCHS = (datetime(1899, 12, 30), datetime(1904, 1, 1))
+
+
+def cell_style(num_format_str=''):
+    """
+    Returns the xlwt style for a number format, building it only the first time the format is used.
+    """
+    style = _styleCache.get(num_format_str)
+    if style is None:
+        style = _styleCache[num_format_str] = xlwt.easyxf('', num_format_str=num_format_str or 'General')
+    return style
+
+
+def engine_for(filename):
+    """
+    Returns the engine that reads and writes the file, chosen from its extension.
+    """
+    if os.path.splitext(filename)[1].lower() in XLSX_EXTENSIONS:
+        return XLSX_ENGINE
+    return XLS_ENGINE
+
+
+def iter_sheet_rows(sheet, start=0, stop=None):
+    """
+    Yields (values, types) for each row from start up to, but not including, stop.
+    Sheets that can stream their rows do so instead of being loaded completely.
+    """
+    stream = getattr(sheet, 'iter_rows_with_types', None)
+    if stream is not None:
+        return stream(start, stop)
+    if stop is None or stop > sheet.nrows:
+        stop = sheet.nrows
+    return ((sheet.row_values(row_index), sheet.row_types(row_index)) for row_index in range(start, stop))
+
+
+def _current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _current_umask()
+
+
+def write_workbook(workbook, filename):
+    """
+    Saves a built workbook under a temporary name in the directory of the file and renames it to the file, so the file
+    is never left partly written. The file keeps its permissions when it is replaced.
+    """
+    filename = os.path.abspath(filename)
+    directory, name = os.path.split(filename)
+    handle, temporary_path = tempfile.mkstemp(dir=directory, prefix='.' + name + '.', suffix=os.path.splitext(name)[1])
+    os.close(handle)
+    try:
+        with stats.timer('write_workbook'):
+            workbook.save(temporary_path)
+        if os.path.exists(filename):
+            mode = os.stat(filename).st_mode & 0o777
+            if os.name == 'nt':
+                # Windows does not rename over an existing file.
+                os.remove(filename)
+        else:
+            mode = 0o666 & ~_UMASK
+        os.chmod(temporary_path, mode)
+        os.rename(temporary_path, filename)
+    except Exception:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def _to_serial(value, datemode):
+    delta = value - _EPOCHS[datemode]
+    return delta.days + delta.seconds / 86400.0 + delta.microseconds / 86400e6
+
+
+def _convert_value(value, datemode):
+    """
+    Converts an openpyxl cell value to the (value, type) pair xlrd would have returned.
+    """
+    if value is None:
+        return '', XL_CELL_EMPTY
+    if isinstance(value, bool):
+        return int(value), XL_CELL_BOOLEAN
+    if isinstance(value, (int, long, float)):
+        return float(value), XL_CELL_NUMBER
+    if isinstance(value, datetime):
+        return _to_serial(value, datemode), XL_CELL_DATE
+    if isinstance(value, date):
+        return _to_serial(datetime(value.year, value.month, value.day), datemode), XL_CELL_DATE
+    if isinstance(value, time):
+        return (value.hour * 3600 + value.minute * 60 + value.second) / 86400.0, XL_CELL_DATE
+    if isinstance(value, timedelta):
+        return value.days + value.seconds / 86400.0, XL_CELL_NUMBER
+    return value, XL_CELL_TEXT
+
+
+def _python_value(value, ctype, datemode):
+    """
+    Converts an xlrd (value, type) pair to the Python value that is written to another workbook.
+    """
+    if ctype == XL_CELL_DATE:
+        if value < 1:
+            return time(*xlrd.xldate_as_tuple(value, datemode)[3:])
+        return datetime(*xlrd.xldate_as_tuple(value, datemode))
+    if ctype == XL_CELL_BOOLEAN:
+        return bool(value)
+    if ctype == XL_CELL_ERROR:
+        return xlrd.error_text_from_code.get(value)
+    if ctype in (XL_CELL_EMPTY, XL_CELL_BLANK):
+        return None
+    return value
+
+
+def typed_values(values, types, datemode, dates):
+    """
+    Converts the values of a column to Python values in one pass: dates and times to datetime and time, booleans to bool,
+    error codes to their text and empty cells to None. Converted dates are kept in the dates dictionary, so a date that
+    repeats is converted once. Date numbers that are not valid dates are left as numbers.
+    """
+    typed = list(values)
+    if set(types) <= _PLAIN_TYPES:
+        return typed
+    for index, ctype in enumerate(types):
+        if ctype == XL_CELL_DATE:
+            value = values[index]
+            converted = dates.get(value)
+            if converted is None:
+                converted = dates[value] = _date_value(value, datemode)
+            typed[index] = converted
+        elif ctype not in _PLAIN_TYPES:
+            typed[index] = _python_value(values[index], ctype, datemode)
+    return typed
+
+
+_PLAIN_TYPES = frozenset([XL_CELL_NUMBER, XL_CELL_TEXT])
+
+
+def _date_value(value, datemode):
+    # Dates after the 1900 leap year bug are counted directly from the epoch, which is what xldate_as_tuple does
+    # with more steps. Earlier dates, times and invalid numbers go through xlrd.
+    if value >= 61 or (datemode == 1 and value >= 1):
+        days = int(value)
+        try:
+            return _EPOCHS[datemode] + timedelta(days, int(round((value - days) * 86400.0)))
+        except OverflowError:
+            return value
+    try:
+        return _python_value(value, XL_CELL_DATE, datemode)
+    except xlrd.XLDateError:
+        return value
+
+
+def _output_rows(sheet, edits, datemode):
+    """
+    Yields the cells of a sheet view as lists of (value, number format), taking the value and format of
+    pending writes from the journal so they are written exactly as they were given.
+    """
+    for row_index, (values, types) in enumerate(iter_sheet_rows(sheet)):
+        cells = []
+        for col_index, (value, ctype) in enumerate(zip(values, types)):
+            value = _python_value(value, ctype, datemode)
+            cells.append((value, DATE_FORMAT if ctype == XL_CELL_DATE else ''))
+        if edits is not None:
+            for col_index, entry in edits.rows.get(row_index, {}).items():
+                cells[col_index] = entry
+        yield cells
+
+
+def _require_openpyxl():
+    openpyxl = optional_module('openpyxl')
+    if openpyxl is None:
+        raise ImportError('Reading and writing .xlsx files requires openpyxl, install it with: pip install openpyxl')
+    return openpyxl
+
+
+class XlsEngine(object):
+    """
+    Reads .xls files with xlrd and writes them with xlwt, copying the formatting of the opened workbook with xlutils.
+    """
+
+    name = 'xls'
+
+    def open_book(self, path, use_mmap=True, formatting_info=True):
+        with stats.timer('open_workbook'):
+            return xlrd.open_workbook(path, formatting_info=formatting_info, on_demand=True, use_mmap=use_mmap)
+
+    def save(self, filename, book, journal, sheetNames, get_sheet, datemode, keep_formatting=False):
+        workbook = self.build(book, journal, sheetNames, get_sheet, datemode, keep_formatting)
+        write_workbook(workbook, filename)
+        return workbook
+
+    def build(self, book, journal, sheetNames, get_sheet, datemode, keep_formatting=False):
+        """
+        Returns the xlwt workbook to save, which no longer depends on the book or the journal it was built from.
+        With keep_formatting, a written cell of the opened workbook keeps its formatting and only its number format is
+        replaced when the write gives one.
+        """
+        if isinstance(book, xlrd.Book):
+            with stats.timer('load_sheet'):
+                # The copy unloads the sheets of an on demand book, the sheets kept here still hold their formatting.
+                sources = book.sheets()
+            with stats.timer('copy_workbook'):
+                # This is what xlutils.copy does, the writer also holds the xlwt style of every XF of the book.
+                writer = xlutils_filter.XLWTWriter()
+                xlutils_filter.process(xlutils_filter.XLRDReader(book, 'unknown.xls'), writer)
+                workbook = writer.output[0][1]
+            with stats.timer('apply_edits'):
+                for sheetname in journal.newSheets:
+                    workbook.add_sheet(sheetname)
+                kept = _KeptStyles(writer.style_list) if keep_formatting else None
+                for sheetname, edits in journal.sheets.items():
+                    sheet_index = sheetNames.index(sheetname)
+                    sheet = workbook.get_sheet(sheet_index)
+                    if kept is not None and sheet_index < len(sources):
+                        source = sources[sheet_index]
+                        for row, column, (value, num_format_str) in edits.cells():
+                            sheet.write(row, column, value, kept.style(source, row, column, num_format_str))
+                    else:
+                        for row, column, (value, num_format_str) in edits.cells():
+                            sheet.write(row, column, value, cell_style(num_format_str))
+        else:
+            with stats.timer('build_workbook'):
+                workbook = xlwt.Workbook()
+                for sheetname in sheetNames:
+                    sheet = workbook.add_sheet(sheetname)
+                    edits = journal.sheet_edits(sheetname)
+                    for row, cells in enumerate(_output_rows(get_sheet(sheetname), edits, datemode)):
+                        for column, (value, num_format_str) in enumerate(cells):
+                            if value is not None:
+                                sheet.write(row, column, value, cell_style(num_format_str))
+        return workbook
+
+
+class _KeptStyles(object):
+    """
+    The xlwt styles that keep the formatting of the cells of a copied workbook. The style for an XF and a number format
+    is made once, so writes keeping their formatting cost the same as writes with a plain style.
+    """
+
+    def __init__(self, style_list):
+        self._style_list = style_list
+        self._styles = {}
+
+    def style(self, sheet, row, column, num_format_str):
+        try:
+            xf_index = sheet.cell_xf_index(row, column)
+        except IndexError:
+            # The cell is outside of the cells the sheet had, so it had no formatting of its own.
+            return cell_style(num_format_str)
+        styles = self._styles.get(num_format_str)
+        if styles is None:
+            styles = self._styles[num_format_str] = {}
+        style = styles.get(xf_index)
+        if style is None:
+            style = self._style_list[xf_index]
+            if num_format_str:
+                style = copy(style)
+                style.num_format_str = num_format_str
+            styles[xf_index] = style
+        return style
+
+
+class XlsxEngine(object):
+    """
+    Reads .xlsx files with the openpyxl read only parser and writes them with openpyxl.
+
+    Workbooks opened from an .xlsx file are saved by applying the pending writes to a full openpyxl workbook so their
+    formatting is kept, every other workbook is streamed row by row into a write only workbook.
+    """
+
+    name = 'xlsx'
+
+    def open_book(self, path, use_mmap=True, formatting_info=True):
+        # The read only parser never reads formatting, the full workbook is only loaded when saving.
+        _require_openpyxl()
+        return XlsxBook(path)
+
+    def save(self, filename, book, journal, sheetNames, get_sheet, datemode, keep_formatting=False):
+        if isinstance(book, XlsxBook):
+            workbook = self.build(book, journal, sheetNames, get_sheet, datemode, keep_formatting)
+        else:
+            # The rows are streamed from the sheets while the file is written instead of being collected first.
+            _require_openpyxl()
+            workbook = _WriteOnlyWorkbook([(sheetname, _output_rows(get_sheet(sheetname), journal.sheet_edits(sheetname), datemode))
+                                           for sheetname in sheetNames])
+        write_workbook(workbook, filename)
+        return workbook
+
+    def build(self, book, journal, sheetNames, get_sheet, datemode, keep_formatting=False):
+        """
+        Returns the openpyxl workbook to save, or for a workbook that was not opened from an .xlsx file its collected rows,
+        which no longer depend on the book or the journal they were built from.
+        Written cells of an opened .xlsx workbook always keep their formatting, so keep_formatting changes nothing.
+        """
+        openpyxl = _require_openpyxl()
+        if isinstance(book, XlsxBook):
+            with stats.timer('copy_workbook'):
+                workbook = openpyxl.load_workbook(BytesIO(book.data))
+            with stats.timer('apply_edits'):
+                for sheetname in journal.newSheets:
+                    workbook.create_sheet(sheetname)
+                for sheetname, edits in journal.sheets.items():
+                    worksheet = workbook[sheetname]
+                    for row, column, (value, num_format_str) in edits.cells():
+                        cell = worksheet.cell(row=row + 1, column=column + 1)
+                        cell.value = value
+                        if num_format_str:
+                            cell.number_format = num_format_str
+            return workbook
+        with stats.timer('build_workbook'):
+            return _WriteOnlyWorkbook([(sheetname, list(_output_rows(get_sheet(sheetname), journal.sheet_edits(sheetname), datemode)))
+                                       for sheetname in sheetNames])
+
+
+class _WriteOnlyWorkbook(object):
+    """
+    The rows of each sheet of a workbook that is written with the openpyxl write only workbook when it is saved.
+    """
+
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def save(self, filename):
+        # The write only workbook serializes the rows as they are appended, so writing includes building.
+        openpyxl = _require_openpyxl()
+        workbook = openpyxl.Workbook(write_only=True)
+        for sheetname, rows in self.sheets:
+            worksheet = workbook.create_sheet(sheetname)
+            for cells in rows:
+                worksheet.append([self._write_only_cell(worksheet, value, num_format_str)
+                                  for (value, num_format_str) in cells])
+        workbook.save(filename)
+
+    def _write_only_cell(self, worksheet, value, num_format_str):
+        if not num_format_str or value is None:
+            return value
+        cell = load('openpyxl.cell').WriteOnlyCell(worksheet, value=value)
+        cell.number_format = num_format_str
+        return cell
+
+
+class XlsxBook(object):
+    """
+    An .xlsx workbook opened with the openpyxl read only parser, offering the parts of the xlrd Book interface the library uses.
+
+    The file is read into memory once, so the workbook does not keep the file open and is not affected by the file being rewritten.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as source:
+            self.data = source.read()
+        openpyxl = _require_openpyxl()
+        with stats.timer('open_workbook'):
+            self._workbook = openpyxl.load_workbook(BytesIO(self.data), read_only=True, data_only=True)
+        self._sheetNames = list(self._workbook.sheetnames)
+        epoch = getattr(self._workbook, 'epoch', getattr(self._workbook, 'excel_base_date', None))
+        self.datemode = 1 if epoch == load('openpyxl.utils.datetime').CALENDAR_MAC_1904 else 0
+        self._sheets = {}
+
+    @property
+    def nsheets(self):
+        return len(self._sheetNames)
+
+    def sheet_names(self):
+        return list(self._sheetNames)
+
+    def sheet_by_index(self, sheetx):
+        sheetname = self._sheetNames[sheetx]
+        sheet = self._sheets.get(sheetname)
+        if sheet is None:
+            sheet = self._sheets[sheetname] = XlsxSheet(sheetname, self._workbook[sheetname], self.datemode)
+        return sheet
+
+    def sheet_loaded(self, sheetx):
+        # Sheets are parsed when their cells are first needed, not when they are looked up.
+        return True
+
+    def unload_sheet(self, sheetx):
+        self._sheets.pop(self._sheetNames[sheetx], None)
+
+    def sheet_by_name(self, sheetname):
+        return self.sheet_by_index(self._sheetNames.index(sheetname))
+
+    def get_sheet(self, sheetx):
+        return self.sheet_by_index(sheetx)
+
+    def sheets(self):
+        return [self.sheet_by_index(sheetx) for sheetx in range(self.nsheets)]
+
+
+class XlsxSheet(object):
+    """
+    A worksheet of an XlsxBook. Rows are streamed from the read only parser until a keyword needs random access to
+    the cells, the values and types are then loaded once into plain lists.
+    """
+
+    def __init__(self, name, worksheet, datemode):
+        self.name = name
+        self._worksheet = worksheet
+        self._datemode = datemode
+        self._values = None
+        self._types = None
+        self._ncols = 0
+
+    @property
+    def nrows(self):
+        self._load()
+        return len(self._values)
+
+    @property
+    def ncols(self):
+        self._load()
+        return self._ncols
+
+    def iter_rows_with_types(self, start=0, stop=None):
+        if self._values is not None:
+            return ((list(self._values[row_index]), self._types[row_index])
+                    for row_index in range(start, len(self._values) if stop is None else min(stop, len(self._values))))
+        return self._stream(start, stop)
+
+    def cell(self, rowx, colx):
+        self._load()
+        return xlrd.sheet.Cell(self._types[rowx][colx], self._values[rowx][colx])
+
+    def cell_value(self, rowx, colx):
+        self._load()
+        return self._values[rowx][colx]
+
+    def cell_type(self, rowx, colx):
+        self._load()
+        return self._types[rowx][colx]
+
+    def row_len(self, rowx):
+        return self.ncols
+
+    def row(self, rowx):
+        return [self.cell(rowx, colx) for colx in range(self.ncols)]
+
+    def row_slice(self, rowx, start_colx=0, end_colx=None):
+        return self.row(rowx)[start_colx:end_colx]
+
+    def row_values(self, rowx, start_colx=0, end_colx=None):
+        self._load()
+        return self._values[rowx][start_colx:end_colx]
+
+    def row_types(self, rowx, start_colx=0, end_colx=None):
+        self._load()
+        return self._types[rowx][start_colx:end_colx]
+
+    def col_values(self, colx, start_rowx=0, end_rowx=None):
+        self._load()
+        return [values[colx] for values in self._values[start_rowx:end_rowx]]
+
+    def col_types(self, colx, start_rowx=0, end_rowx=None):
+        self._load()
+        return [types[colx] for types in self._types[start_rowx:end_rowx]]
+
+    def _stream(self, start, stop):
+        max_row = None if stop is None else stop
+        if max_row is not None and max_row <= start:
+            return
+        for row in self._worksheet.iter_rows(min_row=start + 1, max_row=max_row, values_only=True):
+            values = []
+            types = array('B')
+            for value in row:
+                value, ctype = _convert_value(value, self._datemode)
+                values.append(value)
+                types.append(ctype)
+            yield values, types
+
+    def _load(self):
+        if self._values is not None:
+            return
+        values_rows = []
+        types_rows = []
+        with stats.timer('load_sheet'):
+            for values, types in self._stream(0, None):
+                values_rows.append(values)
+                types_rows.append(types)
+        ncols = max([len(values) for values in values_rows] or [0])
+        for values, types in zip(values_rows, types_rows):
+            missing = ncols - len(values)
+            if missing:
+                values.extend([''] * missing)
+                types.extend([XL_CELL_EMPTY] * missing)
+        while values_rows and not any(types_rows[-1]):
+            values_rows.pop()
+            types_rows.pop()
+        self._ncols = ncols
+        self._types = types_rows
+        self._values = values_rows
+
+
+XLS_ENGINE = XlsEngine()
+XLSX_ENGINE = XlsxEngine()
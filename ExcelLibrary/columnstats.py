@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from math import fsum
+from celltypes import XL_CELL_NUMBER
+from lazyimport import optional_module
+
+
+def numeric_column(sheet, column, start=0, stop=None):
+    """
+    Returns the values of a column with every cell that is not a number, such as text, dates and blank cells,
+    replaced by None. With NumPy installed a float array is returned in which those cells are NaN instead.
+    """
+    numpy = optional_module('numpy')
+    values = sheet.col_values(column, start, stop)
+    types = sheet.col_types(column, start, stop)
+    if numpy is not None:
+        mask = numpy.array(types, dtype=numpy.uint8) == XL_CELL_NUMBER
+        column_values = numpy.full(len(values), numpy.nan)
+        column_values[mask] = numpy.array(values, dtype=object)[mask].astype(numpy.float64)
+        return column_values
+    return [value if ctype == XL_CELL_NUMBER else None for value, ctype in zip(values, types)]
+
+
+def column_statistics(column_values):
+    """
+    Returns the count, sum, minimum, maximum and mean of the number cells of a column read by `numeric_column`.
+    """
+    numpy = optional_module('numpy')
+    if numpy is not None:
+        numbers = column_values[~numpy.isnan(column_values)]
+        count = len(numbers)
+        total = float(numbers.sum())
+        minimum = float(numbers.min()) if count else None
+        maximum = float(numbers.max()) if count else None
+    else:
+        numbers = [value for value in column_values if value is not None]
+        count = len(numbers)
+        total = fsum(numbers)
+        minimum = min(numbers) if count else None
+        maximum = max(numbers) if count else None
+    return {'count': count, 'sum': total, 'min': minimum, 'max': maximum,
+            'mean': total / count if count else None}
+
+
+def column_differences(column_values, other_values, tolerance):
+    """
+    Returns the (row, value, other value) of every row where the columns differ by more than the tolerance, or where
+    only one of them holds a number. Rows past the end of the shorter column count as not holding a number.
+    """
+    numpy = optional_module('numpy')
+    if numpy is not None:
+        length = max(len(column_values), len(other_values))
+        left = numpy.full(length, numpy.nan)
+        left[:len(column_values)] = column_values
+        right = numpy.full(length, numpy.nan)
+        right[:len(other_values)] = other_values
+        left_missing = numpy.isnan(left)
+        right_missing = numpy.isnan(right)
+        with numpy.errstate(invalid='ignore'):
+            different = (numpy.abs(left - right) > tolerance) | (left_missing != right_missing)
+        return [(int(row), None if left_missing[row] else float(left[row]), None if right_missing[row] else float(right[row]))
+                for row in numpy.nonzero(different)[0]]
+    length = max(len(column_values), len(other_values))
+    column_values = list(column_values) + [None] * (length - len(column_values))
+    other_values = list(other_values) + [None] * (length - len(other_values))
+    return [(row, value, other) for row, (value, other) in enumerate(zip(column_values, other_values))
+            if (value is None) != (other is None) or (value is not None and abs(value - other) > tolerance)]
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from datetime import date, datetime, time
+from celltypes import XL_CELL_NUMBER, XL_CELL_DATE, XL_CELL_TEXT, XL_CELL_BOOLEAN, \
+    XL_CELL_BLANK, XL_CELL_EMPTY
+from lazyimport import LazyModule
+
+xlrd = LazyModule('xlrd')
+
+
+class SheetEdits(object):
+    """
+    The pending cell writes of one sheet, stored sparsely as {row: {column: (value, number format)}}.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.nrows = 0
+        self.ncols = 0
+
+    def write(self, row, column, value, num_format_str):
+        self.rows.setdefault(row, {})[column] = (value, num_format_str)
+        self.nrows = max(self.nrows, row + 1)
+        self.ncols = max(self.ncols, column + 1)
+
+    def cells(self):
+        for row, columns in self.rows.items():
+            for column, entry in columns.items():
+                yield row, column, entry
+
+
+class EditJournal(object):
+    """
+    Records the writes and new sheets of a session so that the xlwt workbook is only built when it is saved.
+
+    Every change increases the version of the journal, and the version of the last change to each sheet is kept,
+    so the sheets changed since a given version can be told apart.
+    """
+
+    def __init__(self):
+        self.sheets = {}
+        self.newSheets = []
+        self.version = 0
+        self.sheetVersions = {}
+
+    def write(self, sheetname, row, column, value, num_format_str=''):
+        edits = self.sheets.get(sheetname)
+        if edits is None:
+            edits = self.sheets[sheetname] = SheetEdits()
+        edits.write(row, column, value, num_format_str)
+        self.version += 1
+        self.sheetVersions[sheetname] = self.version
+
+    def add_sheet(self, sheetname):
+        self.newSheets.append(sheetname)
+        self.version += 1
+        self.sheetVersions[sheetname] = self.version
+
+    def modified_sheets(self, since):
+        return set([sheetname for sheetname, version in self.sheetVersions.items() if version > since])
+
+    def sheet_edits(self, sheetname):
+        return self.sheets.get(sheetname)
+
+
+def _edited_cell(entry, datemode):
+    value = entry[0]
+    Cell = xlrd.sheet.Cell
+    if isinstance(value, bool):
+        return Cell(XL_CELL_BOOLEAN, int(value))
+    if isinstance(value, (int, long, float)):
+        return Cell(XL_CELL_NUMBER, float(value))
+    if isinstance(value, datetime):
+        return Cell(XL_CELL_DATE, xlrd.xldate.xldate_from_datetime_tuple(value.timetuple()[:6], datemode))
+    if isinstance(value, date):
+        return Cell(XL_CELL_DATE, xlrd.xldate.xldate_from_datetime_tuple(value.timetuple()[:3] + (0, 0, 0), datemode))
+    if isinstance(value, time):
+        return Cell(XL_CELL_DATE, (value.hour * 3600 + value.minute * 60 + value.second) / 86400.0)
+    if value is None or value == '':
+        return Cell(XL_CELL_BLANK, '')
+    return Cell(XL_CELL_TEXT, value)
+
+
+class EditedSheet(object):
+    """
+    A read only view of an xlrd sheet, or of a sheet that only exists in the journal, with the pending writes applied.
+
+    It provides the parts of the xlrd Sheet interface that the library reads through.
+    """
+
+    def __init__(self, name, base, edits, datemode):
+        self.name = name
+        self._base = base
+        self._edits = edits
+        self._datemode = datemode
+        self.nrows = max(base.nrows if base else 0, edits.nrows if edits else 0)
+        self.ncols = max(base.ncols if base else 0, edits.ncols if edits else 0)
+
+    def cell(self, rowx, colx):
+        if not (-self.nrows <= rowx < self.nrows and -self.ncols <= colx < self.ncols):
+            raise IndexError('cell (%d, %d) is outside of sheet %s' % (rowx, colx, self.name))
+        rowx %= self.nrows
+        colx %= self.ncols
+        if self._edits is not None:
+            entry = self._edits.rows.get(rowx, {}).get(colx)
+            if entry is not None:
+                return _edited_cell(entry, self._datemode)
+        base = self._base
+        if base is not None and rowx < base.nrows and colx < base.row_len(rowx):
+            return base.cell(rowx, colx)
+        return xlrd.sheet.Cell(XL_CELL_EMPTY, '')
+
+    def cell_value(self, rowx, colx):
+        return self.cell(rowx, colx).value
+
+    def cell_type(self, rowx, colx):
+        return self.cell(rowx, colx).ctype
+
+    def cell_xf_index(self, rowx, colx):
+        base = self._base
+        if base is not None and rowx < base.nrows and colx < base.row_len(rowx):
+            return base.cell_xf_index(rowx, colx)
+        return None
+
+    def row_len(self, rowx):
+        return self.ncols
+
+    def row(self, rowx):
+        return [self.cell(rowx, colx) for colx in range(self.ncols)]
+
+    def row_slice(self, rowx, start_colx=0, end_colx=None):
+        return self.row(rowx)[start_colx:end_colx]
+
+    def row_values(self, rowx, start_colx=0, end_colx=None):
+        return self._row(rowx, 'value')[start_colx:end_colx]
+
+    def row_types(self, rowx, start_colx=0, end_colx=None):
+        return self._row(rowx, 'ctype')[start_colx:end_colx]
+
+    def col_values(self, colx, start_rowx=0, end_rowx=None):
+        return self._column(colx, 'value')[start_rowx:end_rowx]
+
+    def col_types(self, colx, start_rowx=0, end_rowx=None):
+        return self._column(colx, 'ctype')[start_rowx:end_rowx]
+
+    def _row(self, rowx, attribute):
+        if not -self.nrows <= rowx < self.nrows:
+            raise IndexError('row %d is outside of sheet %s' % (rowx, self.name))
+        rowx %= self.nrows
+        base = self._base
+        if base is not None and rowx < base.nrows:
+            if attribute == 'value':
+                values = base.row_values(rowx)
+            else:
+                values = list(base.row_types(rowx))
+        else:
+            values = []
+        values.extend(['' if attribute == 'value' else XL_CELL_EMPTY] * (self.ncols - len(values)))
+        if self._edits is not None:
+            for colx, entry in self._edits.rows.get(rowx, {}).items():
+                values[colx] = getattr(_edited_cell(entry, self._datemode), attribute)
+        return values
+
+    def _column(self, colx, attribute):
+        if not -self.ncols <= colx < self.ncols:
+            raise IndexError('column %d is outside of sheet %s' % (colx, self.name))
+        colx %= self.ncols
+        base = self._base
+        values = []
+        if base is not None and colx < base.ncols:
+            if attribute == 'value':
+                values = base.col_values(colx)
+            else:
+                values = list(base.col_types(colx))
+        values.extend(['' if attribute == 'value' else XL_CELL_EMPTY] * (self.nrows - len(values)))
+        if self._edits is not None:
+            for rowx, columns in self._edits.rows.items():
+                entry = columns.get(colx)
+                if entry is not None:
+                    values[rowx] = getattr(_edited_cell(entry, self._datemode), attribute)
+        return values
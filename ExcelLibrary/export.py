@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import csv
+import gzip
+import json
+import os
+from datetime import date, time
+from backends import iter_sheet_rows, typed_values
+
+
+def export_csv(sheet, path, datemode, typed=False, compress=False, delimiter=','):
+    """
+    Writes the rows of a sheet to a CSV file one row at a time and returns the number of rows written.
+    Text is written as UTF-8. With typed, dates are written as ISO dates, booleans as TRUE or FALSE and errors as their text.
+    """
+    dates = {} if typed else None
+    rows = 0
+    with _open_output(path, compress) as output:
+        writer = csv.writer(output, delimiter=str(delimiter), lineterminator='\n')
+        for values, types in iter_sheet_rows(sheet):
+            if typed:
+                values = typed_values(values, types, datemode, dates)
+            writer.writerow([_csv_value(value) for value in values])
+            rows += 1
+    return rows
+
+
+def export_json_lines(sheets, path, datemode, typed=False, compress=False):
+    """
+    Writes the rows of each (name, sheet) pair to a JSON Lines file, one {"sheet", "row", "values"} object per line,
+    and returns the number of rows written. With typed, dates are written as ISO dates, booleans as true or false,
+    errors as their text and empty cells as null.
+    """
+    dates = {} if typed else None
+    rows = 0
+    with _open_output(path, compress) as output:
+        for name, sheet in sheets:
+            # The line is put together by hand to keep the keys in order, json.dumps escapes every text to ASCII.
+            prefix = '{"sheet": %s, "row": ' % json.dumps(name)
+            for row, (values, types) in enumerate(iter_sheet_rows(sheet)):
+                if typed:
+                    values = [_json_value(value) for value in typed_values(values, types, datemode, dates)]
+                output.write('%s%d, "values": %s}\n' % (prefix, row, json.dumps(values)))
+                rows += 1
+    return rows
+
+
+def _open_output(path, compress):
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    if compress:
+        # Level 6 is what the gzip tool uses, the default level 9 takes about twice as long for little gain.
+        return gzip.open(path, 'wb', 6)
+    return open(path, 'wb')
+
+
+def _csv_value(value):
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    if isinstance(value, float):
+        # str() rounds floats to 12 digits in Python 2, repr() keeps every digit.
+        return repr(value)
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if value is None:
+        return ''
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+def _json_value(value):
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
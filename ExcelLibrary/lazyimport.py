@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import sys
+from importlib import import_module
+from perfstats import stats
+
+_MISSING = object()
+_optional = {}
+
+
+class LazyModule(object):
+    """
+    Stands in for a module that is only imported when one of its attributes is first used, so that importing the library
+    for a dry run or for its keyword documentation does not import the libraries that read and write workbooks.
+
+    An attribute is looked up on the module once and then kept on this object, so later uses cost a plain attribute lookup.
+    """
+
+    def __init__(self, name):
+        self._lazy_name = name
+
+    def __getattr__(self, attribute):
+        if attribute.startswith('__'):
+            raise AttributeError(attribute)
+        value = getattr(load(self._lazy_name), attribute)
+        setattr(self, attribute, value)
+        return value
+
+    def __repr__(self):
+        return '<lazy module %s>' % self._lazy_name
+
+
+def load(name):
+    """
+    Imports a module, timing the import as import_<name> when it is the first one.
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        with stats.timer('import_' + name):
+            module = import_module(name)
+    return module
+
+
+def optional_module(name):
+    """
+    Returns the module, importing it on first use, or None when it is not installed.
+    """
+    module = _optional.get(name, _MISSING)
+    if module is _MISSING:
+        try:
+            module = load(name)
+        except ImportError:
+            module = None
+        _optional[name] = module
+    return module
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+import time
+
+
+class _NoOpTimer(object):
+    """
+    The timer handed out while the statistics are disabled. A single instance is shared, so timing a phase only costs a
+    method call and an empty with block.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_OP_TIMER = _NoOpTimer()
+
+
+class _PhaseTimer(object):
+
+    __slots__ = ('_stats', '_phase', '_start')
+
+    def __init__(self, stats, phase):
+        self._stats = stats
+        self._phase = phase
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stats.add_time(self._phase, time.time() - self._start)
+        return False
+
+
+class PerformanceStats(object):
+    """
+    Process wide timings of the internal phases of the library, such as parsing, copying and writing workbooks,
+    and counters for the cells read and written, the bytes loaded and saved and the workbook cache.
+
+    Nothing is recorded until the statistics are enabled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.counters = {}
+
+    def timer(self, phase):
+        if not self.enabled:
+            return _NO_OP_TIMER
+        return _PhaseTimer(self, phase)
+
+    def count(self, counter, amount=1):
+        # Counting does nothing while disabled, so callers only check enabled first when working out the amount
+        # costs something, such as a file size or a sum over rows.
+        if self.enabled:
+            with self._lock:
+                self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def add_time(self, phase, seconds):
+        with self._lock:
+            calls, total = self.phases.get(phase, (0, 0.0))
+            self.phases[phase] = (calls + 1, total + seconds)
+
+    def reset(self):
+        with self._lock:
+            self.phases = {}
+            self.counters = {}
+
+    def snapshot(self):
+        with self._lock:
+            return {'enabled': self.enabled,
+                    'phases': dict((phase, {'calls': calls, 'seconds': seconds})
+                                   for phase, (calls, seconds) in self.phases.items()),
+                    'counters': dict(self.counters)}
+
+
+stats = PerformanceStats()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from collections import Mapping
+
+
+class Header(object):
+    """
+    The column names of a header row and the column of each name. Empty header cells are skipped and when a name
+    repeats, the first column with that name is used. Number headers are named without a trailing .0.
+    """
+
+    __slots__ = ('names', 'columns')
+
+    def __init__(self, values):
+        names = []
+        columns = {}
+        for column, value in enumerate(values):
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            name = value if isinstance(value, basestring) else unicode(value)
+            if name == '' or name in columns:
+                continue
+            names.append(name)
+            columns[name] = column
+        self.names = tuple(names)
+        self.columns = columns
+
+
+class Record(object):
+    """
+    A read only mapping of the column names of a header to the values of one row. It only holds the header, which is
+    shared by every record of the sheet, and the list of row values.
+    """
+
+    __slots__ = ('_header', '_values')
+
+    def __init__(self, header, values):
+        self._header = header
+        self._values = values
+
+    def __getitem__(self, name):
+        column = self._header.columns[name]
+        values = self._values
+        return values[column] if column < len(values) else ''
+
+    def __iter__(self):
+        return iter(self._header.names)
+
+    def __len__(self):
+        return len(self._header.names)
+
+    def __contains__(self, name):
+        return name in self._header.columns
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def get(self, name, default=None):
+        return self[name] if name in self._header.columns else default
+
+    def keys(self):
+        return list(self._header.names)
+
+    def values(self):
+        return [self[name] for name in self._header.names]
+
+    def items(self):
+        return [(name, self[name]) for name in self._header.names]
+
+    def iterkeys(self):
+        return iter(self._header.names)
+
+    def itervalues(self):
+        return iter(self.values())
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return '{%s}' % ', '.join(['%r: %r' % item for item in self.items()])
+
+
+# Registered rather than inherited, the Python 2 abstract base classes have no __slots__ and would add a __dict__ to every record.
+Mapping.register(Record)
+
+
+class RecordList(object):
+    """
+    The rows of a sheet below its header as a read only sequence of records. A row is only read, and its record made,
+    when it is used, so listing a large sheet does not build a record for every row up front.
+
+    The sheet and its header are looked up through sheet_of and header_of on every access, and once when an iteration
+    starts, so the list shows the writes made to the sheet after it was returned like the other reading keywords.
+    """
+
+    __slots__ = ('_name', '_sheet_of', '_header_of', '_first')
+
+    def __init__(self, name, sheet_of, header_of, first):
+        self._name = name
+        self._sheet_of = sheet_of
+        self._header_of = header_of
+        self._first = first
+
+    def __len__(self):
+        return self._length(self._sheet_of())
+
+    def __getitem__(self, index):
+        sheet = self._sheet_of()
+        length = self._length(sheet)
+        if isinstance(index, slice):
+            header = self._header_of()
+            return [Record(header, sheet.row_values(self._first + position)) for position in range(*index.indices(length))]
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('record %d is outside of the %d records of sheet %s' % (index, length, self._name))
+        return Record(self._header_of(), sheet.row_values(self._first + index))
+
+    def __iter__(self):
+        sheet = self._sheet_of()
+        header = self._header_of()
+        row_values = sheet.row_values
+        for row in range(self._first, self._first + self._length(sheet)):
+            yield Record(header, row_values(row))
+
+    def __repr__(self):
+        return '<%d records of sheet %s>' % (len(self), self._name)
+
+    def _length(self, sheet):
+        return max(0, sheet.nrows - self._first)
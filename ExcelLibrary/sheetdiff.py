@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from lazyimport import LazyModule
+
+xlrd = LazyModule('xlrd')
+
+
+def sheet_differences(actual, expected, keyColumns=None, tolerance=0, ignoreOrder=False, key_of=None):
+    """
+    Returns the differences between two sheets as a list of short descriptions, in the order of the actual sheet.
+
+    Rows are paired by position, by the values of the key columns, or with ignoreOrder by their whole contents, and
+    only the pairs whose rows are not equal as a whole are compared cell by cell. key_of normalizes key values.
+    With ignoreOrder, rows without an equal row are then paired with a row whose numbers are all within the tolerance.
+    """
+    width = max(actual.ncols, expected.ncols)
+    actualRows = _rows(actual, width)
+    expectedRows = _rows(expected, width)
+    tolerance = float(tolerance)
+    if keyColumns:
+        pairs, differences = _pair_by_key(actualRows, expectedRows, keyColumns, key_of or (lambda value: value))
+    elif ignoreOrder:
+        pairs, differences = _pair_by_contents(actualRows, expectedRows, tolerance)
+    else:
+        pairs = [(row, row) for row in range(min(len(actualRows), len(expectedRows)))]
+        differences = ['Row %d is missing, expected %s' % (row + 1, _compact(expectedRows[row]))
+                       for row in range(len(actualRows), len(expectedRows))]
+        differences.extend(['Row %d is unexpected: %s' % (row + 1, _compact(actualRows[row]))
+                            for row in range(len(expectedRows), len(actualRows))])
+    for actualRow, expectedRow in pairs:
+        actualValues = actualRows[actualRow]
+        expectedValues = expectedRows[expectedRow]
+        if actualValues == expectedValues:
+            continue
+        for column, (value, expectedValue) in enumerate(zip(actualValues, expectedValues)):
+            if value != expectedValue and not _within(value, expectedValue, tolerance):
+                location = xlrd.cellname(actualRow, column)
+                if expectedRow != actualRow:
+                    location += ' (expected row %d)' % (expectedRow + 1)
+                differences.append('%s is %r, expected %r' % (location, value, expectedValue))
+    return differences
+
+
+def _rows(sheet, width):
+    rows = []
+    for row in range(sheet.nrows):
+        values = sheet.row_values(row)
+        if len(values) < width:
+            values = list(values) + [''] * (width - len(values))
+        rows.append(values)
+    return rows
+
+
+def _pair_by_key(actualRows, expectedRows, keyColumns, key_of):
+    differences = []
+    expectedByKey = {}
+    for row, values in enumerate(expectedRows):
+        key = tuple([key_of(values[column]) for column in keyColumns])
+        if key in expectedByKey:
+            differences.append('Key %s is duplicated in expected rows %d and %d' % (_compact(key), expectedByKey[key] + 1, row + 1))
+        else:
+            expectedByKey[key] = row
+    pairs = []
+    seen = {}
+    for row, values in enumerate(actualRows):
+        key = tuple([key_of(values[column]) for column in keyColumns])
+        if key in seen:
+            differences.append('Key %s is duplicated in rows %d and %d' % (_compact(key), seen[key] + 1, row + 1))
+            continue
+        seen[key] = row
+        expectedRow = expectedByKey.get(key)
+        if expectedRow is None:
+            differences.append('Row %d with key %s is unexpected' % (row + 1, _compact(key)))
+        else:
+            pairs.append((row, expectedRow))
+    differences.extend(['Row with key %s is missing, expected at row %d' % (_compact(key), row + 1)
+                        for key, row in sorted(expectedByKey.items(), key=lambda item: item[1]) if key not in seen])
+    return pairs, differences
+
+
+def _pair_by_contents(actualRows, expectedRows, tolerance):
+    # Rows are matched by hashing their whole contents, so equal rows pair up wherever they are.
+    unmatched = {}
+    for row, values in enumerate(expectedRows):
+        unmatched.setdefault(tuple(values), []).append(row)
+    unexpected = []
+    for row, values in enumerate(actualRows):
+        rows = unmatched.get(tuple(values))
+        if rows:
+            rows.pop(0)
+        else:
+            unexpected.append(row)
+    missing = sorted([row for rows in unmatched.values() for row in rows])
+    if tolerance and unexpected and missing:
+        # Only the rows left over by the exact match are compared with each other, each with the first row it is within tolerance of.
+        remaining = []
+        for row in unexpected:
+            for position, expectedRow in enumerate(missing):
+                if _row_within(actualRows[row], expectedRows[expectedRow], tolerance):
+                    del missing[position]
+                    break
+            else:
+                remaining.append(row)
+        unexpected = remaining
+    differences = ['Row %d is unexpected: %s' % (row + 1, _compact(actualRows[row])) for row in unexpected]
+    differences.extend(['Row %d is missing, expected %s' % (row + 1, _compact(expectedRows[row])) for row in missing])
+    return [], differences
+
+
+def _row_within(values, expectedValues, tolerance):
+    for value, expectedValue in zip(values, expectedValues):
+        if value != expectedValue and not _within(value, expectedValue, tolerance):
+            return False
+    return True
+
+
+def _within(value, expectedValue, tolerance):
+    if not tolerance or isinstance(value, basestring) or isinstance(expectedValue, basestring):
+        return False
+    return abs(value - expectedValue) <= tolerance
+
+
+def _compact(values):
+    return '[%s]' % ', '.join([repr(value) for value in values])
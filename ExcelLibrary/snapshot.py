@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from struct import calcsize, pack, unpack_from
+from celltypes import XL_CELL_TEXT, XL_CELL_BOOLEAN, XL_CELL_ERROR, XL_CELL_EMPTY, XL_CELL_BLANK
+from lazyimport import LazyModule
+from perfstats import stats
+
+xlrd = LazyModule('xlrd')
+
+_MAGIC = 'XLSNAP\x00\x01'
+_PREAMBLE = '<8sI'
+
+
+class SnapshotCache(object):
+    """
+    A directory of pre-parsed workbook snapshots, shared by every process that uses the same directory.
+
+    A snapshot holds the cell values and types of every sheet of a workbook. Its file name is a hash of the absolute path,
+    modification time and size of the workbook, so a workbook that is rewritten gets a new snapshot.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+
+    def open(self, path, stat, engine, use_mmap=True, formatting_info=True):
+        """
+        Returns the snapshot of the workbook, writing it first when no process has written it yet.
+        Without a cache directory, or when the snapshot cannot be written, the workbook is parsed as usual.
+        """
+        if not self.directory:
+            return engine.open_book(path, use_mmap=use_mmap, formatting_info=formatting_info)
+        snapshot_path = os.path.join(self.directory, self._name(path, stat))
+        if os.path.exists(snapshot_path):
+            stats.count('snapshot_hits')
+            return SnapshotBook(snapshot_path, path)
+        stats.count('snapshot_misses')
+        book = engine.open_book(path, use_mmap=False, formatting_info=False)
+        try:
+            with stats.timer('write_snapshot'):
+                write_snapshot(snapshot_path, book, path, stat)
+        except (IOError, OSError):
+            return book
+        return SnapshotBook(snapshot_path, path)
+
+    def _name(self, path, stat):
+        key = '%s|%r|%d|%s' % (_path_bytes(path), stat.st_mtime, stat.st_size, _MAGIC)
+        return hashlib.sha1(key).hexdigest() + '.xlsnap'
+
+
+def _path_bytes(path):
+    """
+    Returns the path as UTF-8 bytes. A byte string path is decoded with the file system encoding first, so the same
+    file named by a byte string or by a unicode path gets the same snapshot. A path that does not decode is used as it is.
+    """
+    if isinstance(path, str):
+        try:
+            path = path.decode(sys.getfilesystemencoding() or 'ascii')
+        except UnicodeDecodeError:
+            return path
+    return path.encode('utf-8')
+
+
+def write_snapshot(snapshot_path, book, path, stat):
+    """
+    Writes the values and types of every sheet of the book to the snapshot file.
+    The file is written under a temporary name and renamed, so other processes never map a partly written snapshot.
+
+    Each sheet is stored column by column as an array of one byte cell types followed by an array of doubles. Text cells
+    store the index of their text in a string table shared by the whole workbook.
+    """
+    strings = {}
+    sheets = []
+    blocks = []
+    sheetNames = book.sheet_names()
+    for sheet_index in range(book.nsheets):
+        sheet = book.sheet_by_index(sheet_index)
+        types = array('B')
+        values = array('d')
+        for colx in range(sheet.ncols):
+            column_types = sheet.col_types(colx)
+            for value, ctype in zip(sheet.col_values(colx), column_types):
+                if ctype == XL_CELL_TEXT:
+                    value = strings.setdefault(value, len(strings))
+                elif ctype in (XL_CELL_EMPTY, XL_CELL_BLANK):
+                    value = 0
+                values.append(value)
+            types.extend(column_types)
+        sheets.append({'name': sheetNames[sheet_index], 'nrows': sheet.nrows, 'ncols': sheet.ncols})
+        blocks.append((types, values))
+
+    texts = [None] * len(strings)
+    for text, index in strings.items():
+        texts[index] = text.encode('utf-8') if isinstance(text, unicode) else text
+    offsets = array('I', [0])
+    for text in texts:
+        offsets.append(offsets[-1] + len(text))
+
+    header = {'source': _path_bytes(path).decode('utf-8', 'replace'), 'mtime': stat.st_mtime, 'size': stat.st_size, 'datemode': book.datemode,
+              'sheets': sheets, 'strings': len(texts)}
+    header_bytes = json.dumps(header).encode('utf-8')
+    position = _aligned(calcsize(_PREAMBLE) + len(header_bytes) + 8 * (2 * len(sheets) + 2))
+    layout = []
+    for types, values in blocks:
+        types_offset = position
+        values_offset = _aligned(types_offset + len(types))
+        layout.append((types_offset, values_offset))
+        position = values_offset + 8 * len(values)
+    offsets_offset = position
+    data_offset = offsets_offset + 4 * len(offsets)
+
+    directory = os.path.dirname(snapshot_path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    handle, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(pack(_PREAMBLE, _MAGIC, len(header_bytes)))
+            output.write(header_bytes)
+            for types_offset, values_offset in layout:
+                output.write(pack('<QQ', types_offset, values_offset))
+            output.write(pack('<QQ', offsets_offset, data_offset))
+            for (types, values), (types_offset, values_offset) in zip(blocks, layout):
+                _pad_to(output, types_offset)
+                output.write(types.tostring())
+                _pad_to(output, values_offset)
+                output.write(_little_endian(values).tostring())
+            _pad_to(output, offsets_offset)
+            output.write(_little_endian(offsets).tostring())
+            output.write(''.join(texts))
+        _replace(temporary_path, snapshot_path)
+    except Exception:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def _aligned(position):
+    return (position + 7) & ~7
+
+
+def _pad_to(output, position):
+    output.write('\0' * (position - output.tell()))
+
+
+def _little_endian(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def _replace(source, target):
+    try:
+        os.rename(source, target)
+    except OSError:
+        # Windows does not rename over an existing file, which another process has then written already.
+        os.remove(source)
+        if not os.path.exists(target):
+            raise
+
+
+class SnapshotBook(object):
+    """
+    A workbook read from a snapshot file. The file is memory mapped read only, so processes using the same snapshot share
+    its pages and cells are only decoded when they are read.
+
+    It offers the parts of the xlrd Book interface the library reads through. Saving needs the formatting of the original
+    workbook, which is parsed again by `open_source`. The source path recorded in the snapshot is only used when no path is given.
+    """
+
+    def __init__(self, snapshot_path, source=None):
+        with open(snapshot_path, 'rb') as snapshot:
+            self._map = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = unpack_from(_PREAMBLE, self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError("'%s' is not a workbook snapshot" % snapshot_path)
+        position = calcsize(_PREAMBLE)
+        header = json.loads(self._map[position:position + header_length].decode('utf-8'))
+        position += header_length
+        self.path = header['source'] if source is None else source
+        self.mtime = header['mtime']
+        self.size = header['size']
+        self.datemode = header['datemode']
+        self._strings = _StringTable(self._map, header['strings'],
+                                     *unpack_from('<QQ', self._map, position + 16 * len(header['sheets'])))
+        self._sheets = []
+        for index, sheet in enumerate(header['sheets']):
+            types_offset, values_offset = unpack_from('<QQ', self._map, position + 16 * index)
+            self._sheets.append(SnapshotSheet(sheet['name'], sheet['nrows'], sheet['ncols'], self._map,
+                                              types_offset, values_offset, self._strings))
+        self._sheetNames = [sheet.name for sheet in self._sheets]
+
+    @property
+    def nsheets(self):
+        return len(self._sheets)
+
+    def sheet_names(self):
+        return list(self._sheetNames)
+
+    def sheet_by_index(self, sheetx):
+        return self._sheets[sheetx]
+
+    def sheet_by_name(self, sheetname):
+        return self._sheets[self._sheetNames.index(sheetname)]
+
+    def sheet_loaded(self, sheetx):
+        return True
+
+    def unload_sheet(self, sheetx):
+        # The pages of the snapshot are managed by the operating system.
+        pass
+
+    def sheets(self):
+        return list(self._sheets)
+
+    def open_source(self, engine):
+        """
+        Parses the workbook the snapshot was taken from, which must not have changed since.
+        """
+        stat = os.stat(self.path)
+        if stat.st_mtime != self.mtime or stat.st_size != self.size:
+            raise ValueError("'%s' has changed on disk since it was opened" % self.path)
+        return engine.open_book(self.path, use_mmap=False)
+
+
+class _StringTable(object):
+
+    def __init__(self, data, count, offsets_offset, data_offset):
+        self._data = data
+        self._count = count
+        self._offsets = offsets_offset
+        self._start = data_offset
+        self._decoded = {}
+
+    def __getitem__(self, index):
+        text = self._decoded.get(index)
+        if text is None:
+            start, end = unpack_from('<II', self._data, self._offsets + 4 * index)
+            text = self._decoded[index] = self._data[self._start + start:self._start + end].decode('utf-8')
+        return text
+
+
+class SnapshotSheet(object):
+    """
+    A sheet of a SnapshotBook, offering the parts of the xlrd Sheet interface the library reads through.
+    """
+
+    def __init__(self, name, nrows, ncols, data, types_offset, values_offset, strings):
+        self.name = name
+        self.nrows = nrows
+        self.ncols = ncols
+        self._data = data
+        self._types = types_offset
+        self._values = values_offset
+        self._strings = strings
+
+    def cell(self, rowx, colx):
+        return xlrd.sheet.Cell(self.cell_type(rowx, colx), self.cell_value(rowx, colx))
+
+    def cell_value(self, rowx, colx):
+        index = self._index(rowx, colx)
+        return self._value(ord(self._data[self._types + index]), unpack_from('<d', self._data, self._values + 8 * index)[0])
+
+    def cell_type(self, rowx, colx):
+        return ord(self._data[self._types + self._index(rowx, colx)])
+
+    def row_len(self, rowx):
+        return self.ncols
+
+    def row(self, rowx):
+        return [self.cell(rowx, colx) for colx in range(self.ncols)]
+
+    def row_slice(self, rowx, start_colx=0, end_colx=None):
+        return self.row(rowx)[start_colx:end_colx]
+
+    def row_values(self, rowx, start_colx=0, end_colx=None):
+        return [self.cell_value(rowx, colx) for colx in range(self.ncols)[start_colx:end_colx]]
+
+    def row_types(self, rowx, start_colx=0, end_colx=None):
+        return [self.cell_type(rowx, colx) for colx in range(self.ncols)[start_colx:end_colx]]
+
+    def col_values(self, colx, start_rowx=0, end_rowx=None):
+        start, stop = self._column_range(colx, start_rowx, end_rowx)
+        types = bytearray(self._data[self._types + start:self._types + stop])
+        values = unpack_from('<%dd' % (stop - start), self._data, self._values + 8 * start)
+        value_of = self._value
+        return [value_of(ctype, value) for ctype, value in zip(types, values)]
+
+    def col_types(self, colx, start_rowx=0, end_rowx=None):
+        start, stop = self._column_range(colx, start_rowx, end_rowx)
+        return list(bytearray(self._data[self._types + start:self._types + stop]))
+
+    def _value(self, ctype, value):
+        if ctype == XL_CELL_TEXT:
+            return self._strings[int(value)]
+        if ctype in (XL_CELL_EMPTY, XL_CELL_BLANK):
+            return ''
+        if ctype in (XL_CELL_BOOLEAN, XL_CELL_ERROR):
+            return int(value)
+        return value
+
+    def _index(self, rowx, colx):
+        if not (-self.nrows <= rowx < self.nrows and -self.ncols <= colx < self.ncols):
+            raise IndexError('cell (%d, %d) is outside of sheet %s' % (rowx, colx, self.name))
+        return (colx % self.ncols) * self.nrows + rowx % self.nrows
+
+    def _column_range(self, colx, start_rowx, end_rowx):
+        if not -self.ncols <= colx < self.ncols:
+            raise IndexError('column %d is outside of sheet %s' % (colx, self.name))
+        base = (colx % self.ncols) * self.nrows
+        start, stop, step = slice(start_rowx, end_rowx).indices(self.nrows)
+        return base + start, base + max(start, stop)
@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+
+
+#  Copyright 2013-2014 NaviNet Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Benchmarks the ExcelLibrary keywords on generated workbooks of increasing size.
+
+Every keyword case runs in a fresh Python process so that its peak memory can be measured on its own. The results are
+written as JSON and can be compared against a stored baseline to catch regressions.
+
+Usage:
+
+    python benchmark.py --profile small --output results.json
+    python benchmark.py --profile small --baseline baseline.json
+    python benchmark.py --cases get_sheet_values,save_excel --formats xls
+
+The comparison fails, with exit code 1, when a case is slower than the baseline by more than the tolerance. Cases
+that have no entry in the baseline are listed so that the baseline can be regenerated with them.
+The time to import the library in a fresh process is measured too, and fails the run when it is over the import budget.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from optparse import OptionParser, SUPPRESS_HELP
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+PROFILES = {
+    'small': [(1000, 10, 1), (10000, 10, 1), (1000, 10, 5)],
+    'medium': [(1000, 10, 1), (10000, 10, 1), (10000, 50, 1), (50000, 10, 1), (10000, 10, 5)],
+    'large': [(10000, 10, 1), (50000, 10, 1), (50000, 50, 1), (65000, 100, 1), (50000, 10, 5)],
+}
+
+SHEET = 'Sheet1'
+
+# The libraries the keywords use, which importing ExcelLibrary should leave until a workbook is first opened or saved.
+DEFERRED_MODULES = ('xlrd', 'xlwt', 'xlutils', 'openpyxl', 'numpy', 'natsort', 'multiprocessing')
+
+_IMPORT_PROBE = '''
+import sys, time
+sys.path.insert(0, %r)
+start = time.time()
+import ExcelLibrary
+seconds = time.time() - start
+import json
+print(json.dumps({'seconds': seconds, 'modules': [name for name in %r if name in sys.modules]}))
+'''
+
+
+def generate_workbook(path, rows, cols, sheets):
+    """
+    Writes a workbook whose sheets hold a mix of numbers, text and dates, in the format given by the file extension.
+    """
+    start = datetime(2000, 1, 1)
+    if path.endswith('.xlsx'):
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        for sheet_index in range(sheets):
+            worksheet = workbook.create_sheet('Sheet%d' % (sheet_index + 1))
+            for row in range(rows):
+                worksheet.append([_value(row, col, start) for col in range(cols)])
+        workbook.save(path)
+        return
+    from xlwt import Workbook, easyxf
+    date_style = easyxf('', num_format_str='d.M.yyyy')
+    workbook = Workbook()
+    for sheet_index in range(sheets):
+        sheet = workbook.add_sheet('Sheet%d' % (sheet_index + 1))
+        for row in range(rows):
+            sheet_row = sheet.row(row)
+            for col in range(cols):
+                value = _value(row, col, start)
+                if isinstance(value, datetime):
+                    sheet_row.write(col, value, date_style)
+                else:
+                    sheet_row.write(col, value)
+    workbook.save(path)
+
+
+def _value(row, col, start):
+    kind = col % 3
+    if kind == 0:
+        return row * 1.5 + col
+    if kind == 1:
+        return 'text %d-%d' % (row, col)
+    return start + timedelta(days=row % 5000)
+
+
+def _setup_open(lib, path):
+    pass
+
+
+def _setup_cold(lib, path):
+    lib.open_excel(path)
+
+
+def _setup_opened(lib, path):
+    lib.open_excel(path)
+    lib.get_row_count(SHEET)
+
+
+def _setup_written(lib, path):
+    _setup_opened(lib, path)
+    lib.put_number_to_cell(SHEET, 0, 0, 1)
+
+
+def _setup_range_written(lib, path, keepFormatting=False):
+    lib.set_excel_keep_cell_formatting(keepFormatting)
+    _setup_opened(lib, path)
+    rows = lib.get_row_count(SHEET)
+    lib.put_values_to_range(SHEET, 0, 0, [[float(row), 'value', 2.0] for row in range(rows)])
+
+
+def _setup_snapshot(lib, path):
+    lib.set_excel_snapshot_cache_directory(os.path.join(os.path.dirname(path), 'snapshots'))
+    lib.open_excel(path)
+    lib.clear_excel_workbook_cache()
+
+
+def _setup_compared(lib, path):
+    lib.open_excel(path, alias='expected')
+    lib.get_row_count(SHEET)
+    _setup_written(lib, path)
+
+
+def _last_row(lib):
+    return lib.get_row_count(SHEET) - 1
+
+
+# Each case is (setup, action). Only the action is timed, setup runs in the same process first.
+# Most setups load the sheet up front, so the first access to a sheet is only timed by the row and column counts.
+CASES = {
+    'open_excel': (_setup_open, lambda lib, path: lib.open_excel(path)),
+    'open_excel_read_only': (_setup_open, lambda lib, path: (lib.open_excel(path, readOnly=True),
+                                                              lib.get_row_count(SHEET))),
+    'open_excel_from_snapshot': (_setup_snapshot, lambda lib, path: (lib.open_excel(path),
+                                                                      lib.read_cell_data_by_coordinates(SHEET, 0, 0))),
+    'get_sheet_names': (_setup_opened, lambda lib, path: lib.get_sheet_names()),
+    'get_row_count': (_setup_cold, lambda lib, path: lib.get_row_count(SHEET)),
+    'get_column_count': (_setup_cold, lambda lib, path: lib.get_column_count(SHEET)),
+    'read_cell_data_by_name': (_setup_opened, lambda lib, path: [lib.read_cell_data_by_name(SHEET, 'A%d' % (row + 1))
+                                                                 for row in range(0, _last_row(lib), 97)]),
+    'read_cell_data_by_coordinates': (_setup_opened, lambda lib, path: [lib.read_cell_data_by_coordinates(SHEET, 0, row)
+                                                                        for row in range(0, _last_row(lib), 97)]),
+    'check_cell_type': (_setup_opened, lambda lib, path: lib.check_cell_type(SHEET, 2, 1)),
+    'get_row_values': (_setup_opened, lambda lib, path: lib.get_row_values(SHEET, _last_row(lib))),
+    'get_column_values': (_setup_opened, lambda lib, path: lib.get_column_values(SHEET, 0)),
+    'get_sheet_values': (_setup_opened, lambda lib, path: lib.get_sheet_values(SHEET)),
+    'get_sheet_values_grid': (_setup_opened, lambda lib, path: lib.get_sheet_values(SHEET, outputFormat='grid')),
+    'get_sheet_values_dict': (_setup_opened, lambda lib, path: lib.get_sheet_values(SHEET, outputFormat='dict')),
+    'get_row_values_grid': (_setup_opened, lambda lib, path: lib.get_row_values(SHEET, _last_row(lib), outputFormat='grid')),
+    'get_column_values_grid': (_setup_opened, lambda lib, path: lib.get_column_values(SHEET, 0, outputFormat='grid')),
+    'get_sheet_values_as_typed_table': (_setup_opened, lambda lib, path: lib.get_sheet_values_as_typed_table(SHEET)),
+    'get_range_values': (_setup_opened, lambda lib, path: lib.get_range_values(SHEET, 'A1:J%d' % (_last_row(lib) + 1))),
+    'get_workbook_values': (_setup_opened, lambda lib, path: lib.get_workbook_values()),
+    'get_workbook_values_grid': (_setup_opened, lambda lib, path: lib.get_workbook_values(outputFormat='grid')),
+    'export_sheet_to_csv': (_setup_opened, lambda lib, path: lib.export_sheet_to_csv(
+        SHEET, os.path.splitext(path)[0] + '.csv', typedDates=True)),
+    'export_workbook_to_json_lines': (_setup_opened, lambda lib, path: lib.export_workbook_to_json_lines(
+        os.path.splitext(path)[0] + '.jsonl.gz', typedDates=True)),
+    'read_excel_files_in_parallel': (_setup_open, lambda lib, path: lib.read_excel_files_in_parallel([path] * 4)),
+    'iterate_sheet_rows': (_setup_opened, lambda lib, path: sum(len(chunk) for chunk in lib.iterate_sheet_rows(SHEET))),
+    'get_sheet_as_records': (_setup_opened, lambda lib, path: [record.values() for record in lib.get_sheet_as_records(SHEET)]),
+    'get_record_by_row': (_setup_opened, lambda lib, path: [lib.get_record_by_row(SHEET, row) for row in range(1, 1000)]),
+    'find_rows_by_value': (_setup_opened, lambda lib, path: [lib.find_rows_by_value(SHEET, 0, row * 1.5)
+                                                             for row in range(1000)]),
+    'get_column_statistics': (_setup_opened, lambda lib, path: lib.get_column_statistics(SHEET, 0)),
+    'column_should_sum_to': (_setup_opened, lambda lib, path: lib.column_should_sum_to(
+        SHEET, 0, lib.get_column_statistics(SHEET, 0)['sum'])),
+    'columns_should_be_equal_within_tolerance': (_setup_opened, lambda lib, path: lib.columns_should_be_equal_within_tolerance(
+        SHEET, 0, 0, 0.001)),
+    'get_excel_sheet_differences': (_setup_compared, lambda lib, path: lib.get_excel_sheet_differences(SHEET, 'expected')),
+    'put_number_to_cell': (_setup_opened, lambda lib, path: [lib.put_number_to_cell(SHEET, 0, row, row)
+                                                             for row in range(1000)]),
+    'put_string_to_cell': (_setup_opened, lambda lib, path: [lib.put_string_to_cell(SHEET, 1, row, 'value')
+                                                             for row in range(1000)]),
+    'put_date_to_cell': (_setup_opened, lambda lib, path: [lib.put_date_to_cell(SHEET, 2, row, '1-4-1989')
+                                                           for row in range(100)]),
+    'put_values_to_range': (_setup_opened, lambda lib, path: lib.put_values_to_range(
+        SHEET, 0, 0, [[row, 'value', '1-4-1989'] for row in range(1000)], 'number, string, date')),
+    'modify_cell_with': (_setup_opened, lambda lib, path: [lib.modify_cell_with(SHEET, 0, row, '*', '2')
+                                                           for row in range(1000)]),
+    'add_to_date': (_setup_opened, lambda lib, path: [lib.add_to_date(SHEET, 2, row, 3) for row in range(1000)]),
+    'subtract_from_date': (_setup_opened, lambda lib, path: [lib.subtract_from_date(SHEET, 2, row, 3)
+                                                             for row in range(1000)]),
+    'add_new_sheet': (_setup_written, lambda lib, path: lib.add_new_sheet('Added')),
+    'save_excel': (_setup_written, lambda lib, path: lib.save_excel(_output_path(path))),
+    'save_excel_after_range_write': (_setup_range_written, lambda lib, path: lib.save_excel(_output_path(path))),
+    'save_excel_keeping_formatting': (lambda lib, path: _setup_range_written(lib, path, True),
+                                      lambda lib, path: lib.save_excel(_output_path(path))),
+    'save_excel_if_modified_unchanged': (_setup_opened, lambda lib, path: lib.save_excel_if_modified(path)),
+    'save_excel_in_background': (_setup_written, lambda lib, path: lib.save_excel_in_background(_output_path(path))),
+    'save_excel_in_background_and_wait': (_setup_written, lambda lib, path: (lib.save_excel_in_background(_output_path(path)),
+                                                                             lib.wait_for_excel_save())),
+}
+
+
+def _output_path(path):
+    base, extension = os.path.splitext(path)
+    return base + '-saved' + extension
+
+
+def _peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_case(case, path):
+    """
+    Runs one case in the current process and returns its measurements.
+    """
+    from ExcelLibrary import ExcelLibrary
+    lib = ExcelLibrary()
+    setup, action = CASES[case]
+    setup(lib, path)
+    rss_before = _peak_rss_kb()
+    start = time.time()
+    action(lib, path)
+    seconds = time.time() - start
+    rss_after = _peak_rss_kb()
+    return {'seconds': seconds,
+            'peak_rss_kb': rss_after,
+            'peak_rss_growth_kb': None if rss_after is None else rss_after - rss_before}
+
+
+def _run_isolated(case, path, repeat):
+    best = None
+    for attempt in range(repeat):
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--run-case', case, path])
+        result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def measure_import(repeat):
+    """
+    Returns the fastest time to import the library in a fresh Python process and the deferred modules that the import loaded.
+    """
+    best = None
+    for attempt in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', _IMPORT_PROBE % (ROOT, DEFERRED_MODULES)])
+        result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def run_benchmarks(sizes, formats, cases, repeat, workdir, log=sys.stderr):
+    results = []
+    for extension in formats:
+        for rows, cols, sheets in sizes:
+            path = os.path.join(workdir, 'bench-%dx%dx%d.%s' % (rows, cols, sheets, extension))
+            if not os.path.exists(path):
+                log.write('generating %s\n' % path)
+                generate_workbook(path, rows, cols, sheets)
+            for case in cases:
+                result = _run_isolated(case, path, repeat)
+                result.update({'case': case, 'format': extension, 'rows': rows, 'cols': cols, 'sheets': sheets,
+                               'file_bytes': os.path.getsize(path)})
+                log.write('%-30s %-4s %6d x %3d x %d  %9.4fs  %8s KB\n' % (
+                    case, extension, rows, cols, sheets, result['seconds'], result['peak_rss_kb']))
+                results.append(result)
+    return results
+
+
+def _metadata():
+    versions = {}
+    for module in ('xlrd', 'xlwt', 'xlutils', 'natsort', 'openpyxl', 'numpy'):
+        try:
+            imported = __import__(module)
+        except ImportError:
+            versions[module] = None
+            continue
+        versions[module] = getattr(imported, '__VERSION__', None) or getattr(imported, '__version__', None)
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created': datetime.now().isoformat(),
+            'versions': versions}
+
+
+def _key(result):
+    return (result['case'], result['format'], result['rows'], result['cols'], result['sheets'])
+
+
+def compare(results, baseline, tolerance, minimum_seconds):
+    """
+    Returns a description of each result that is slower than its baseline by more than the tolerance, and of each
+    result that has no baseline to compare with. Differences smaller than minimum_seconds are ignored as noise.
+    """
+    expected = dict((_key(result), result) for result in baseline['results'])
+    regressions = []
+    missing = []
+    for result in results:
+        name = '%s %s %dx%dx%d' % (result['case'], result['format'], result['rows'], result['cols'], result['sheets'])
+        previous = expected.get(_key(result))
+        if previous is None:
+            missing.append('%s: %.4fs' % (name, result['seconds']))
+            continue
+        slower = result['seconds'] - previous['seconds']
+        if slower > minimum_seconds and result['seconds'] > previous['seconds'] * (1 + tolerance):
+            regressions.append('%s: %.4fs, baseline %.4fs' % (name, result['seconds'], previous['seconds']))
+    return regressions, missing
+
+
+def _formats(requested):
+    formats = [extension.strip() for extension in requested.split(',')]
+    if 'xlsx' in formats:
+        try:
+            import openpyxl
+        except ImportError:
+            sys.stderr.write('openpyxl is not installed, skipping the xlsx format\n')
+            formats.remove('xlsx')
+    return formats
+
+
+def main(argv):
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('--profile', default='small', choices=sorted(PROFILES),
+                      help='workbook sizes to run, one of %s' % ', '.join(sorted(PROFILES)))
+    parser.add_option('--formats', default='xls,xlsx', help='comma separated file formats, default xls,xlsx')
+    parser.add_option('--cases', default=None, help='comma separated cases to run, by default every case')
+    parser.add_option('--repeat', type='int', default=1, help='runs per case, the fastest run is kept')
+    parser.add_option('--workdir', default=os.path.join(tempfile.gettempdir(), 'excellibrary-benchmark'),
+                      help='directory for the generated workbooks, which are reused between runs')
+    parser.add_option('--output', default=None, help='file the JSON results are written to')
+    parser.add_option('--baseline', default=None, help='JSON results of an earlier run to compare against')
+    parser.add_option('--tolerance', type='float', default=0.25,
+                      help='allowed slowdown against the baseline, default 0.25')
+    parser.add_option('--minimum-seconds', type='float', default=0.005, help='slowdowns below this are ignored')
+    parser.add_option('--import-budget', type='float', default=0.25,
+                      help='seconds importing the library may take, default 0.25')
+    parser.add_option('--run-case', nargs=2, default=None, help=SUPPRESS_HELP)
+    options, args = parser.parse_args(argv)
+
+    if options.run_case:
+        case, path = options.run_case
+        print(json.dumps(run_case(case, path)))
+        return 0
+
+    cases = sorted(CASES) if options.cases is None else [case.strip() for case in options.cases.split(',')]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error('unknown cases: %s' % ', '.join(unknown))
+    if not os.path.isdir(options.workdir):
+        os.makedirs(options.workdir)
+    imported = measure_import(max(options.repeat, 3))
+    sys.stderr.write('%-30s %9.4fs  budget %.4fs  deferred modules loaded: %s\n' % (
+        'import ExcelLibrary', imported['seconds'], options.import_budget, ', '.join(imported['modules']) or 'none'))
+    results = run_benchmarks(PROFILES[options.profile], _formats(options.formats), cases, options.repeat,
+                             options.workdir)
+    report = {'meta': _metadata(), 'profile': options.profile, 'results': results,
+              'import': dict(imported, budget=options.import_budget)}
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    if options.baseline:
+        with open(options.baseline) as baseline:
+            regressions, missing = compare(results, json.load(baseline), options.tolerance, options.minimum_seconds)
+        for result in missing:
+            sys.stderr.write('NO BASELINE %s\n' % result)
+        for regression in regressions:
+            sys.stderr.write('REGRESSION %s\n' % regression)
+        if regressions:
+            return 1
+    if imported['seconds'] > options.import_budget:
+        sys.stderr.write('REGRESSION importing ExcelLibrary took %.4fs, budget %.4fs\n'
+                         % (imported['seconds'], options.import_budget))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -53,6 +53,6 @@ setup(name              = 'robotframework-excellibrary',
                                                       'natsort >= 3.3.0'
                         ],
       packages          = ['ExcelLibrary'],
-      data_files        = [('ExcelRobotTest', ['Tests/acceptance/ExcelRobotTest.txt', 'Tests/acceptance/ExcelRobotTest.xls', 'doc/ExcelLibrary-KeywordDocumentation.html', 'doc/ChangeLog.txt'])],
+      data_files        = [('ExcelRobotTest', ['Tests/acceptance/ExcelRobotTest.txt', 'Tests/acceptance/ExcelRobotTest.xls', 'Tests/acceptance/ExcelRobotTest.xlsx', 'doc/ExcelLibrary-KeywordDocumentation.html', 'doc/ChangeLog.txt'])],
       download_url      = 'https://github.com/NaviNet/robotframework-excellibrary/tarball/0.0.2',
       )